@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+导入耗时检查
+
+使用 python -X importtime 测量只读取 Token 的路径（包导入和 main.py --info）
+的启动开销，并确认其间没有导入 Selenium。超出预算或导入了 Selenium 时以非零状态退出。
+
+使用方法：
+  python3 benchmarks/import_time.py
+  python3 benchmarks/import_time.py --budget-ms 80
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from make_vscdb import make_vscdb  # noqa: E402
+
+
+def measure_import(statement: str):
+    """
+    在全新解释器中执行导入语句
+
+    Returns:
+        (包导入累计耗时毫秒, 是否导入了 selenium)
+    """
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    cumulative_us = 0
+    selenium = False
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = [part.strip() for part in line.split(':', 1)[1].split('|')]
+        if len(fields) != 3 or not fields[1].isdigit():
+            continue
+        _self_us, cumulative, name = fields
+        if name.startswith('selenium'):
+            selenium = True
+        if name == 'cursor_login':
+            cumulative_us = int(cumulative)
+    return cumulative_us / 1000.0, selenium
+
+
+def measure_info_command(db_path: str, cache_dir: str) -> float:
+    """测量 main.py --info 的完整墙钟时间（毫秒）"""
+    env = dict(os.environ, CURSOR_LOGIN_DB_PATH=db_path, CURSOR_LOGIN_CACHE_DIR=cache_dir)
+    started = time.perf_counter()
+    subprocess.run([sys.executable, 'main.py', '--info'], cwd=ROOT, env=env,
+                   stdout=subprocess.DEVNULL, check=True)
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="导入耗时检查")
+    parser.add_argument('--budget-ms', type=float, default=100.0,
+                        help="cursor_login 包导入的耗时预算（毫秒）")
+    args = parser.parse_args()
+
+    ok = True
+
+    import_ms, selenium = measure_import("from cursor_login import get_cursor_token")
+    print(f"from cursor_login import get_cursor_token: {import_ms:.1f} ms")
+    if selenium:
+        print("  ❌ 导入了 selenium")
+        ok = False
+    if import_ms > args.budget_ms:
+        print(f"  ❌ 超出预算 {args.budget_ms:.0f} ms")
+        ok = False
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, "state.vscdb")
+        make_vscdb(db_path)
+        cache_dir = os.path.join(workdir, "cache")
+        cold = measure_info_command(db_path, cache_dir)
+        warm = measure_info_command(db_path, cache_dir)
+    print(f"main.py --info（进程总耗时）: 首次 {cold:.0f} ms，缓存命中 {warm:.0f} ms")
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+生成合成的 Cursor state.vscdb
+
+包含 ItemTable 表以及形似真实签名的 JWT Refresh Token，供基准测试离线使用。
+
+使用方法：
+  python3 benchmarks/make_vscdb.py /tmp/state.vscdb --email bench@example.com
+"""
+
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import sqlite3
+import time
+from typing import Dict
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def make_jwt(user_id: str, ttl: int = 30 * 24 * 3600) -> str:
+    """
+    生成 HS256 签名的 JWT
+
+    Args:
+        user_id: 用户 ID（写入 sub，带 auth0| 前缀）
+        ttl: 有效期（秒）
+
+    Returns:
+        JWT 字符串
+    """
+    now = int(time.time())
+    header = {'alg': 'HS256', 'typ': 'JWT'}
+    payload = {
+        'sub': f'auth0|{user_id}',
+        'iat': now,
+        'exp': now + ttl,
+        'iss': 'https://authentication.cursor.sh',
+        'scope': 'openid profile email offline_access'
+    }
+    signing_input = f"{_b64url(json.dumps(header).encode())}.{_b64url(json.dumps(payload).encode())}"
+    signature = hmac.new(secrets.token_bytes(32), signing_input.encode('ascii'), hashlib.sha256).digest()
+    return f"{signing_input}.{_b64url(signature)}"
+
+
+def make_vscdb(path: str, email: str = "bench@example.com", filler_rows: int = 500,
+               ttl: int = 30 * 24 * 3600) -> Dict[str, str]:
+    """
+    生成合成数据库
+
+    Args:
+        path: 输出路径（已存在会被覆盖）
+        email: 写入 cursorAuth/cachedEmail 的邮箱
+        filler_rows: 额外填充的无关键值行数，模拟真实数据库体积
+        ttl: Token 有效期（秒）
+
+    Returns:
+        {'email', 'token', 'user_id'} 字典
+    """
+    user_id = f"user_{secrets.token_hex(12).upper()}"
+    token = make_jwt(user_id, ttl)
+
+    if os.path.exists(path):
+        os.remove(path)
+
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("CREATE TABLE ItemTable (key TEXT UNIQUE ON CONFLICT REPLACE, value BLOB)")
+        rows = [(f"workbench.filler.{i}", json.dumps({'i': i, 'pad': 'x' * 64})) for i in range(filler_rows)]
+        rows += [
+            ('cursorAuth/cachedEmail', email),
+            ('cursorAuth/refreshToken', token),
+            ('cursorAuth/accessToken', make_jwt(user_id, 3600)),
+        ]
+        conn.executemany("INSERT INTO ItemTable (key, value) VALUES (?, ?)", rows)
+        conn.commit()
+    finally:
+        conn.close()
+
+    return {'email': email, 'token': token, 'user_id': user_id}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成合成的 Cursor state.vscdb")
+    parser.add_argument('path', help="输出路径")
+    parser.add_argument('--email', default="bench@example.com")
+    parser.add_argument('--rows', type=int, default=500, help="填充行数")
+    args = parser.parse_args()
+
+    account = make_vscdb(args.path, email=args.email, filler_rows=args.rows)
+    print(json.dumps(account, indent=2))
+
+
+if __name__ == "__main__":
+    main()
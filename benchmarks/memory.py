@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+多账户内存对比
+
+针对本地模拟 cursor.com，让 N 个账户同时处于登录状态，比较两种方式下
+本进程所有子进程（chromedriver 与 Chrome 各进程）的 RSS 总和：
+
+  browsers  每个账户一个无头 Chrome（DriverPool 的方式）
+  contexts  一个无头 Chrome，每个账户一个隔离的浏览器上下文（ContextPool）
+
+使用方法：
+  python3 benchmarks/memory.py --accounts 4
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from make_vscdb import make_vscdb  # noqa: E402
+from mock_server import MockCursorServer  # noqa: E402
+
+
+def process_tree_rss(root_pid: int) -> Tuple[float, int]:
+    """
+    统计 root_pid 所有后代进程的 RSS 总和
+
+    Returns:
+        (RSS 总和 MB, 进程数)
+    """
+    output = subprocess.run(['ps', '-eo', 'pid=,ppid=,rss='],
+                            capture_output=True, text=True, check=True).stdout
+    children: Dict[int, List[Tuple[int, int]]] = {}
+    for line in output.splitlines():
+        pid, ppid, rss = (int(field) for field in line.split())
+        children.setdefault(ppid, []).append((pid, rss))
+
+    total_kb = 0
+    count = 0
+    stack = [root_pid]
+    while stack:
+        for pid, rss in children.get(stack.pop(), []):
+            total_kb += rss
+            count += 1
+            stack.append(pid)
+    return total_kb / 1024, count
+
+
+def measure(mode: str, infos: List[Dict[str, str]]) -> Dict[str, float]:
+    """让所有账户同时登录并测量内存"""
+    from cursor_login.browser import _set_login_cookie, _verify_login
+    from cursor_login.contexts import ContextPool
+    from cursor_login.driver_service import shared_chromedriver
+    from cursor_login.pool import DriverPool
+
+    with shared_chromedriver():
+        pool_class = ContextPool if mode == "contexts" else DriverPool
+        pool = pool_class(size=len(infos))
+        try:
+            started = time.perf_counter()
+            drivers = [pool.acquire() for _ in infos]
+
+            def _login(args):
+                driver, info = args
+                return _set_login_cookie(driver, info) and _verify_login(driver, info, True)
+
+            with ThreadPoolExecutor(max_workers=len(infos)) as executor:
+                ok = sum(1 for success in executor.map(_login, zip(drivers, infos)) if success)
+            elapsed = time.perf_counter() - started
+
+            rss_mb, processes = process_tree_rss(os.getpid())
+            for driver in drivers:
+                pool.release(driver, discard=True)
+        finally:
+            pool.close()
+
+    return {
+        'accounts': len(infos),
+        'logged_in': ok,
+        'processes': processes,
+        'rss_mb': round(rss_mb, 1),
+        'rss_per_account_mb': round(rss_mb / len(infos), 1),
+        'elapsed_s': round(elapsed, 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多账户内存对比")
+    parser.add_argument('--accounts', '-n', type=int, default=4)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="cursor_login_mem_")
+    account = make_vscdb(os.path.join(workdir, "state.vscdb"))
+    server = MockCursorServer(f"{account['user_id']}::{account['token']}",
+                              email=account['email']).start()
+
+    os.environ.update(server.env())
+    os.environ['CURSOR_LOGIN_CACHE_DIR'] = os.path.join(workdir, "cache")
+
+    from cursor_login.database import build_account_info
+
+    # 每个账户使用同一个模拟会话；上下文之间的 Cookie 仍然彼此隔离
+    infos = [build_account_info(account['email'], account['token']) for _ in range(args.accounts)]
+
+    stdout = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        report = {mode: measure(mode, infos) for mode in ("browsers", "contexts")}
+    finally:
+        sys.stdout = stdout
+        server.stop()
+
+    print(f"{'mode':<10}{'accounts':>9}{'ok':>4}{'procs':>7}{'RSS (MB)':>11}{'MB/account':>12}{'time (s)':>10}")
+    for mode, row in report.items():
+        print(f"{mode:<10}{row['accounts']:>9}{row['logged_in']:>4}{row['processes']:>7}"
+              f"{row['rss_mb']:>11.1f}{row['rss_per_account_mb']:>12.1f}{row['elapsed_s']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
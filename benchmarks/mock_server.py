@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+本地模拟 cursor.com
+
+提供基准测试所需的最小页面：
+  /                              首页
+  /dashboard                     需要会话 Cookie，否则 302 到 /authenticator/login
+  /dashboard?tab=integrations    带 "New User API Key" 按钮和创建弹窗
+  /api/dashboard/create-user-api-key  POST 创建 API Key，返回 JSON
+  /authenticator/login           模拟认证页面
+  /v0/me                         Bearer 认证校验 API Key（只认本服务器创建的 Key）
+
+使用方法：
+  python3 benchmarks/mock_server.py --port 8765 --cookie 'user_xxx::token'
+"""
+
+import argparse
+import json
+import secrets
+import string
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, unquote
+
+COOKIE_NAME = "WorkosCursorSessionToken"
+AUTHENTICATOR_PATH = "/authenticator/login"
+API_KEY_CREATE_PATH = "/api/dashboard/create-user-api-key"
+API_KEY_VALIDATE_PATH = "/v0/me"
+
+HOME_PAGE = """<!doctype html>
+<html><head><title>Cursor</title></head>
+<body><main><h1>Cursor</h1><a href="/dashboard">Dashboard</a></main></body></html>
+"""
+
+AUTH_PAGE = """<!doctype html>
+<html><head><title>Sign in</title></head>
+<body><main><h1>Sign in</h1><input type="email"></main></body></html>
+"""
+
+DASHBOARD_PAGE = """<!doctype html>
+<html><head><title>Dashboard</title></head>
+<body>
+<nav><a href="/dashboard">Overview</a> <a href="/dashboard?tab=integrations">Integrations</a></nav>
+<main><h1>Dashboard</h1><p>Signed in as %(email)s</p></main>
+</body></html>
+"""
+
+INTEGRATIONS_PAGE = """<!doctype html>
+<html><head><title>Integrations</title></head>
+<body>
+<nav><a href="/dashboard">Overview</a> <a href="/dashboard?tab=integrations">Integrations</a></nav>
+<main>
+  <h1>Integrations</h1>
+  <section id="keys"><h2>User API Keys</h2><ul id="key-list"></ul></section>
+  <button id="new-key" style="display:none">New User API Key</button>
+  <div id="modal" style="display:none">
+    <input placeholder="Enter User API Key Name..." id="key-name">
+    <button id="save">Save</button>
+    <pre id="created"></pre>
+  </div>
+</main>
+<script>
+  // 模拟客户端渲染延迟
+  setTimeout(function () { document.getElementById('new-key').style.display = ''; }, %(render_delay)d);
+  document.getElementById('new-key').onclick = function () {
+    document.getElementById('modal').style.display = '';
+  };
+  function save() {
+    fetch('%(create_path)s', {
+      method: 'POST',
+      headers: {'Content-Type': 'application/json'},
+      body: JSON.stringify({name: document.getElementById('key-name').value})
+    }).then(function (r) { return r.json(); }).then(function (data) {
+      document.getElementById('created').textContent = data.apiKey;
+    });
+  }
+  document.getElementById('save').onclick = save;
+  document.getElementById('key-name').addEventListener('keydown', function (e) {
+    if (e.key === 'Enter') save();
+  });
+</script>
+</body></html>
+"""
+
+
+class MockCursorServer:
+    """
+    在后台线程运行的模拟服务器
+
+    Args:
+        cookie_value: 被视为有效的会话 Cookie 值（user_id::token）
+        email: 页面上显示的邮箱
+        host: 监听地址
+        port: 监听端口，0 表示自动分配
+        latency: 每个请求的模拟服务端延迟（秒）
+        render_delay: 按钮延迟出现的毫秒数，模拟客户端渲染
+        dashboard_redirect: 设置后 /dashboard 总是 302 到该地址（模拟跳转到其他站点）
+
+    收到的每个请求以 (方法, 路径, Cookie 请求头) 记录在 requests 中。
+    """
+
+    def __init__(self, cookie_value: str, email: str = "bench@example.com",
+                 host: str = "127.0.0.1", port: int = 0,
+                 latency: float = 0.0, render_delay: int = 150,
+                 dashboard_redirect: str = None):
+        self.cookie_value = cookie_value
+        self.email = email
+        self.latency = latency
+        self.render_delay = render_delay
+        self.dashboard_redirect = dashboard_redirect
+        self.created_keys = []
+        self.requests = []
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    @property
+    def base_url(self) -> str:
+        # 使用 localhost 而非 127.0.0.1：Chrome 允许在 localhost 上设置 Secure Cookie
+        return f"http://localhost:{self.port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def env(self) -> dict:
+        """指向本服务器的 CURSOR_LOGIN_* 配置覆盖"""
+        return {
+            'CURSOR_LOGIN_WEBSITE': f"{self.base_url}/",
+            'CURSOR_LOGIN_DASHBOARD': f"{self.base_url}/dashboard",
+            'CURSOR_LOGIN_INTEGRATIONS': f"{self.base_url}/dashboard?tab=integrations",
+            'CURSOR_LOGIN_API_KEY_CREATE_URL': f"{self.base_url}{API_KEY_CREATE_PATH}",
+            'CURSOR_LOGIN_API_KEY_VALIDATE_URL': f"{self.base_url}{API_KEY_VALIDATE_PATH}",
+            'CURSOR_LOGIN_COOKIE_DOMAIN': "localhost",
+            'CURSOR_LOGIN_AUTHENTICATOR_HOST': AUTHENTICATOR_PATH,
+        }
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # 避免 Nagle 算法与延迟 ACK 叠加造成每个请求约 40ms 的额外延迟
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _authorized(self) -> bool:
+                cookie = SimpleCookie()
+                try:
+                    cookie.load(self.headers.get('Cookie', ''))
+                except Exception:
+                    return False
+                morsel = cookie.get(COOKIE_NAME)
+                return morsel is not None and unquote(morsel.value) == server.cookie_value
+
+            def _send(self, status: int, body: str = '', content_type: str = 'text/html; charset=utf-8',
+                      headers: dict = None):
+                data = body.encode('utf-8')
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                server.requests.append(('GET', self.path, self.headers.get('Cookie')))
+                if server.latency:
+                    time.sleep(server.latency)
+                parts = urlsplit(self.path)
+
+                if parts.path == '/':
+                    return self._send(200, HOME_PAGE)
+                if parts.path == AUTHENTICATOR_PATH:
+                    return self._send(200, AUTH_PAGE)
+                if parts.path == API_KEY_VALIDATE_PATH:
+                    token = self.headers.get('Authorization', '').replace('Bearer ', '', 1)
+                    if token not in {key for _name, key in server.created_keys}:
+                        return self._send(401, json.dumps({'error': 'invalid api key'}), 'application/json')
+                    return self._send(200, json.dumps({'apiKeyName': 'bench'}), 'application/json')
+                if parts.path == '/dashboard':
+                    if server.dashboard_redirect:
+                        return self._send(302, headers={'Location': server.dashboard_redirect})
+                    if not self._authorized():
+                        return self._send(302, headers={'Location': AUTHENTICATOR_PATH})
+                    if parse_qs(parts.query).get('tab') == ['integrations']:
+                        return self._send(200, INTEGRATIONS_PAGE % {
+                            'render_delay': server.render_delay,
+                            'create_path': API_KEY_CREATE_PATH
+                        })
+                    return self._send(200, DASHBOARD_PAGE % {'email': server.email})
+                return self._send(404, 'not found', 'text/plain')
+
+            def do_POST(self):
+                server.requests.append(('POST', self.path, self.headers.get('Cookie')))
+                if server.latency:
+                    time.sleep(server.latency)
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+
+                if urlsplit(self.path).path != API_KEY_CREATE_PATH:
+                    return self._send(404, 'not found', 'text/plain')
+                if not self._authorized():
+                    return self._send(401, json.dumps({'error': 'unauthorized'}), 'application/json')
+
+                try:
+                    name = json.loads(body or b'{}').get('name', '')
+                except ValueError:
+                    name = ''
+                alphabet = string.ascii_letters + string.digits
+                api_key = 'key_' + ''.join(secrets.choice(alphabet) for _ in range(64))
+                server.created_keys.append((name, api_key))
+                return self._send(200, json.dumps({'name': name, 'apiKey': api_key}), 'application/json')
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模拟 cursor.com")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--cookie', required=True, help="有效的会话 Cookie 值（user_id::token）")
+    parser.add_argument('--latency', type=float, default=0.0, help="每个请求的模拟延迟（秒）")
+    args = parser.parse_args()
+
+    server = MockCursorServer(args.cookie, port=args.port, latency=args.latency).start()
+    print(f"Mock cursor.com listening on {server.base_url}")
+    for key, value in server.env().items():
+        print(f"export {key}='{value}'")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
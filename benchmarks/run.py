@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+登录流程端到端基准测试
+
+在临时目录生成合成 state.vscdb，启动本地模拟 cursor.com，
+将 cursor_login 的配置指向它，然后多次运行各阶段并报告 p50/p95 延迟。
+
+阶段：
+  get_cursor_token        读取数据库并解析 JWT（禁用缓存）
+  get_cursor_token:cached 命中本地缓存
+  http_login              HTTP 快速通道（会话验证 + 创建 API Key）
+  launch_browser          启动无头 Chrome
+  set_login_cookie        设置会话 Cookie
+  verify_login            跳转 Dashboard 并验证
+  create_api_key          在 Integrations 页面创建 API Key
+                          （--capture-network 时从网络响应读取）
+
+使用浏览器时还会报告 Dashboard 的页面加载指标（navigation timing）和渲染进程内存
+（CDP Performance.getMetrics），便于对比 --lean 精简配置的效果。
+
+使用方法：
+  python3 benchmarks/run.py --iterations 5
+  python3 benchmarks/run.py --iterations 20 --no-browser   # 仅测试无需浏览器的阶段
+  python3 benchmarks/run.py --capture-network              # 从网络响应读取 API Key
+  python3 benchmarks/run.py --lean                         # 精简浏览器配置
+  python3 benchmarks/run.py --roundtrip-budget set_login_cookie=4,verify_login=12
+                                                           # 每次迭代检查 WebDriver 命令数预算
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from make_vscdb import make_vscdb  # noqa: E402
+from mock_server import MockCursorServer  # noqa: E402
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """最近秩法计算百分位数"""
+    if not samples:
+        return float('nan')
+    ordered = sorted(samples)
+    rank = min(max(1, math.ceil(pct / 100.0 * len(ordered))), len(ordered))
+    return ordered[rank - 1]
+
+
+class Timings:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.failures: Dict[str, int] = {}
+        self.metrics: Dict[str, List[float]] = {}
+
+    def measure(self, name: str, func, *args, **kwargs):
+        started = time.perf_counter()
+        value = func(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+        self.samples.setdefault(name, []).append(elapsed)
+        if value in (None, False):
+            self.failures[name] = self.failures.get(name, 0) + 1
+        return value
+
+    def record(self, name: str, value: float):
+        self.metrics.setdefault(name, []).append(value)
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        report = {
+            name: {
+                'n': len(values),
+                'p50_ms': round(percentile(values, 50) * 1000, 2),
+                'p95_ms': round(percentile(values, 95) * 1000, 2),
+                'failures': self.failures.get(name, 0)
+            }
+            for name, values in self.samples.items()
+        }
+        for name, values in self.metrics.items():
+            report[name] = {
+                'n': len(values),
+                'p50': round(percentile(values, 50), 2),
+                'p95': round(percentile(values, 95), 2)
+            }
+        return report
+
+
+def run(iterations: int, browser: bool, latency: float, render_delay: int,
+        extraction: str = "dom", profile: str = "default",
+        roundtrip_log: Optional[List[Tuple[str, Optional[str]]]] = None,
+        roundtrip_budget: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+    """
+    roundtrip_log 不为 None 时统计浏览器阶段的 WebDriver 命令，每次迭代追加
+    (命令汇总, 超出 roundtrip_budget 时的错误信息或 None)
+    """
+    workdir = tempfile.mkdtemp(prefix="cursor_login_bench_")
+    db_path = os.path.join(workdir, "state.vscdb")
+    account = make_vscdb(db_path)
+
+    server = MockCursorServer(f"{account['user_id']}::{account['token']}",
+                              email=account['email'], latency=latency,
+                              render_delay=render_delay).start()
+
+    # 必须在导入 cursor_login 之前设置，config 在导入时读取环境变量
+    os.environ.update(server.env())
+    os.environ['CURSOR_LOGIN_DB_PATH'] = db_path
+    os.environ['CURSOR_LOGIN_CACHE_DIR'] = os.path.join(workdir, "cache")
+    os.environ['CURSOR_LOGIN_ZSHRC_PATH'] = os.path.join(workdir, "zshrc")
+
+    from cursor_login.database import get_cursor_token
+    from cursor_login.http_backend import login_via_http
+    from cursor_login import roundtrips
+
+    budgets = roundtrips.parse_budgets(roundtrip_budget) if roundtrip_budget else None
+    if roundtrip_log is not None:
+        roundtrips.enable()
+
+    timings = Timings()
+    try:
+        for i in range(iterations):
+            print(f"--- iteration {i + 1}/{iterations}", file=sys.stderr)
+            info = timings.measure("get_cursor_token", get_cursor_token, use_cache=False)
+            timings.measure("get_cursor_token:cached", get_cursor_token)
+            timings.measure("http_login", login_via_http, info)
+
+            if browser:
+                roundtrips.counter.reset()
+                _run_browser_stages(timings, info, extraction, profile)
+                if roundtrip_log is not None:
+                    roundtrip_log.append((roundtrips.counter.summary(),
+                                          _budget_error(roundtrips, budgets)))
+    finally:
+        server.stop()
+
+    return timings.report()
+
+
+def _budget_error(roundtrips, budgets: Optional[Dict[str, int]]) -> Optional[str]:
+    if not budgets:
+        return None
+    try:
+        roundtrips.assert_budget(budgets)
+        return None
+    except roundtrips.BudgetExceeded as e:
+        return str(e)
+
+
+def _run_browser_stages(timings: Timings, info: Dict[str, str], extraction: str = "dom",
+                        profile: str = "default"):
+    from cursor_login.browser import _create_driver, _set_login_cookie, _verify_login
+    from cursor_login.api_key import create_api_key
+
+    driver = timings.measure("launch_browser", _create_driver, True,
+                             capture_network=(extraction == "network"), profile=profile)
+    try:
+        timings.measure("set_login_cookie", _set_login_cookie, driver, info)
+        timings.measure("verify_login", _verify_login, driver, info, True)
+        _record_page_metrics(timings, driver)
+        timings.measure("create_api_key", create_api_key, driver, extraction)
+    finally:
+        driver.quit()
+
+
+# Dashboard 导航的关键时间点（相对 startTime，毫秒）
+_NAVIGATION_TIMING_SCRIPT = """
+var nav = performance.getEntriesByType('navigation')[0];
+if (!nav) { return null; }
+return {
+    dom_content_loaded: nav.domContentLoadedEventEnd,
+    load: nav.loadEventEnd,
+    transferred_kb: performance.getEntriesByType('resource').reduce(
+        function (sum, r) { return sum + (r.transferSize || 0); }, nav.transferSize || 0) / 1024
+};
+"""
+
+
+def _record_page_metrics(timings: Timings, driver):
+    """记录当前页面的加载时间、传输量和渲染进程内存"""
+    try:
+        nav = driver.execute_script(_NAVIGATION_TIMING_SCRIPT)
+        if nav:
+            timings.record("page:dom_content_loaded_ms", nav['dom_content_loaded'])
+            # eager 策略下 load 事件可能尚未触发（值为 0）
+            if nav['load']:
+                timings.record("page:load_ms", nav['load'])
+            timings.record("page:transferred_kb", nav['transferred_kb'])
+
+        driver.execute_cdp_cmd('Performance.enable', {})
+        metrics = driver.execute_cdp_cmd('Performance.getMetrics', {})['metrics']
+        values = {m['name']: m['value'] for m in metrics}
+        timings.record("renderer:js_heap_used_mb", values.get('JSHeapUsedSize', 0) / 2 ** 20)
+        timings.record("renderer:dom_nodes", values.get('Nodes', 0))
+    except Exception as e:
+        print(f"   ⚠️  无法读取页面指标: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="登录流程端到端基准测试")
+    parser.add_argument('--iterations', '-n', type=int, default=5)
+    parser.add_argument('--no-browser', dest='browser', action='store_false',
+                        help="跳过需要 Chrome 的阶段")
+    parser.add_argument('--latency', type=float, default=0.0, help="模拟服务端延迟（秒）")
+    parser.add_argument('--render-delay', type=int, default=150, help="按钮延迟出现的毫秒数")
+    parser.add_argument('--capture-network', dest='extraction', action='store_const',
+                        const='network', default='dom', help="从创建请求的网络响应读取 API Key")
+    parser.add_argument('--lean', dest='profile', action='store_const',
+                        const='lean', default='default', help="使用精简浏览器配置")
+    parser.add_argument('--roundtrips', action='store_true',
+                        help="统计浏览器阶段每个步骤的 WebDriver 命令数")
+    parser.add_argument('--roundtrip-budget', metavar='STEP=N[,STEP=N...]',
+                        help="每次迭代各步骤的 WebDriver 命令数上限（隐含 --roundtrips），超出时退出码为 1")
+    parser.add_argument('--json', metavar='FILE', help="将结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    # cursor_login 须在 run() 设置好环境变量之后才导入，预算也在其中解析
+    roundtrip_log = [] if args.roundtrips or args.roundtrip_budget else None
+
+    # 各阶段自身的进度输出写到 stderr，结果表格写到 stdout
+    stdout = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        report = run(args.iterations, args.browser, args.latency, args.render_delay, args.extraction,
+                     args.profile, roundtrip_log, args.roundtrip_budget)
+    finally:
+        sys.stdout = stdout
+
+    print(f"{'stage':<26}{'n':>4}{'p50 (ms)':>12}{'p95 (ms)':>12}{'fail':>6}")
+    for name, row in report.items():
+        if 'p50_ms' not in row:
+            continue
+        print(f"{name:<26}{row['n']:>4}{row['p50_ms']:>12.2f}{row['p95_ms']:>12.2f}{row['failures']:>6}")
+
+    metrics = [(name, row) for name, row in report.items() if 'p50_ms' not in row]
+    if metrics:
+        print(f"\n{'metric':<26}{'n':>4}{'p50':>12}{'p95':>12}")
+        for name, row in metrics:
+            print(f"{name:<26}{row['n']:>4}{row['p50']:>12.2f}{row['p95']:>12.2f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if roundtrip_log:
+        print(f"\nWebDriver round trips (last iteration):{roundtrip_log[-1][0]}")
+        errors = [f"iteration {i + 1}: {error}" for i, (_, error) in enumerate(roundtrip_log) if error]
+        for error in errors:
+            print(error)
+        if errors:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,7 @@ Cursor 全自动登录工具
   python3 cursor_auto_login.py           # 无头模式（后台运行）
   python3 cursor_auto_login.py --show    # 显示浏览器界面
   python3 cursor_auto_login.py --visible # 显示浏览器界面（同 --show）
+  python3 cursor_auto_login.py --profile # 使用 cProfile 分析各步骤耗时（需要 cursor_login 包）
 """
 
 import sqlite3
@@ -461,9 +462,8 @@ def main():
     """主函数"""
     # 解析命令行参数
     headless = True  # 默认无头模式
-    if len(sys.argv) > 1:
-        arg = sys.argv[1].lower()
-        if arg in ['--show', '--visible', '-v', '-s']:
+    for arg in sys.argv[1:]:
+        if arg.lower() in ['--show', '--visible', '-v', '-s']:
             headless = False
     
     print("\n" + "="*60)
@@ -516,7 +516,13 @@ def main():
 
 if __name__ == "__main__":
     try:
-        main()
+        if '--profile' in sys.argv[1:]:
+            # 按需导入：不使用 --profile 时单文件脚本不依赖 cursor_login 包
+            from cursor_login.profiler import profiled
+            with profiled():
+                main()
+        else:
+            main()
     except KeyboardInterrupt:
         print("\n\n👋 已取消")
     except Exception as e:
@@ -9,13 +9,42 @@ __version__ = "2.0.0"
 __author__ = "DanOps-1"
 
 from .database import get_cursor_token
-from .browser import auto_login_with_selenium, get_manual_login_script
-from .api_key import create_api_key, update_zshrc_with_api_key
+
+# 浏览器相关模块按需加载：只读取 Token 时无需付出导入 Selenium 的开销
+_LAZY_ATTRS = {
+    'auto_login_with_selenium': '.browser',
+    'login_account': '.browser',
+    'get_manual_login_script': '.browser',
+    'create_api_key': '.api_key',
+    'update_zshrc_with_api_key': '.api_key',
+    'DriverPool': '.pool',
+    'run_pipeline': '.pipeline',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    import importlib
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_ATTRS))
+
 
 __all__ = [
     'get_cursor_token',
     'auto_login_with_selenium',
+    'login_account',
     'get_manual_login_script',
     'create_api_key',
     'update_zshrc_with_api_key',
+    'DriverPool',
+    'run_pipeline',
 ]
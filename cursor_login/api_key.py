@@ -3,32 +3,43 @@ API Key 管理模块
 负责创建 API Key 并保存到环境变量
 """
 
+import json
 import os
 import re
+import stat
+import tempfile
 import time
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional
-
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from typing import List, Optional
 
 from .config import (
     CURSOR_INTEGRATIONS,
     API_KEY_PREFIX,
+    API_KEY_PATTERN,
     ZSHRC_PATH,
+    RC_LOCK_PATH,
     ENV_VAR_NAME,
-    DEFAULT_TIMEOUT
+    DEFAULT_TIMEOUT,
+    POLL_FREQUENCY,
+    API_KEY_EXTRACTION
 )
+from .locators import CREATE_BUTTON_LABELS, SAVE_BUTTON_LABELS, find_button
+from .timing import span, timed
+from .waits import navigate, wait_for_page_ready
 
 
-def create_api_key(driver) -> Optional[str]:
+@timed("create_api_key")
+def create_api_key(driver, extraction: str = API_KEY_EXTRACTION,
+                   open_page: bool = True) -> Optional[str]:
     """
     自动创建 Cursor API Key
 
     Args:
         driver: Selenium WebDriver 实例
+        extraction: API Key 提取方式，"dom" 或 "network"
+                    （"network" 需要浏览器启用性能日志）
+        open_page: 是否先跳转到 Integrations 页面（已在该页面时传 False）
 
     Returns:
         成功返回 API Key 字符串，失败返回 None
@@ -37,12 +48,13 @@ def create_api_key(driver) -> Optional[str]:
         print("\n8️⃣ 正在创建 API Key...")
 
         # 导航到 Integrations 页面
-        print("   → 跳转到 Integrations 页面...")
-        driver.get(CURSOR_INTEGRATIONS)
-        time.sleep(2)
+        if open_page:
+            print("   → 跳转到 Integrations 页面...")
+            navigate(driver, CURSOR_INTEGRATIONS)
+            wait_for_page_ready(driver)
 
         # 查找并点击创建按钮
-        api_key = _click_create_button(driver)
+        api_key = _click_create_button(driver, extraction)
         if not api_key:
             return None
 
@@ -56,57 +68,55 @@ def create_api_key(driver) -> Optional[str]:
         return None
 
 
-def _click_create_button(driver) -> Optional[str]:
+def _click_create_button(driver, extraction: str = API_KEY_EXTRACTION) -> Optional[str]:
     """
     查找并点击 API Key 创建按钮，填写表单并提取 API Key
 
     Args:
         driver: Selenium WebDriver 实例
+        extraction: API Key 提取方式，"dom" 或 "network"
 
     Returns:
         成功返回 API Key，失败返回 None
     """
+    from selenium.webdriver.support.ui import WebDriverWait
+
     try:
         print("   → 查找 API Key 创建按钮...")
         wait = WebDriverWait(driver, DEFAULT_TIMEOUT)
 
-        # 尝试查找不同的按钮文本
-        button_texts = [
-            "New User API Key",
-            "New API Key",
-            "User API Key"
-        ]
-
-        new_api_key_button = None
-        for button_text in button_texts:
-            try:
-                print(f"   → 尝试查找 '{button_text}' 按钮...")
-                new_api_key_button = wait.until(
-                    EC.element_to_be_clickable((By.XPATH, f"//button[contains(., '{button_text}')]"))
-                )
-                print(f"   ✅ 找到按钮: {button_text}")
-                break
-            except:
-                continue
+        # 同时等待所有候选文本，上次命中的优先
+        with span("wait:create_button") as s:
+            new_api_key_button = find_button(driver, "create_button", CREATE_BUTTON_LABELS)
+            if not new_api_key_button:
+                s.fail()
 
         if not new_api_key_button:
             raise Exception("找不到 API Key 创建按钮")
 
+        # 记录已有的 Key，提取时只返回新创建的那个
+        known_keys = _snapshot_api_keys(driver)
+
         print("   → 点击按钮...")
         new_api_key_button.click()
 
         # 填写 API Key 名称
         api_key_name = _fill_api_key_name(driver, wait)
 
+        # 丢弃提交前的网络事件，只关注创建请求
+        if extraction == "network":
+            _drain_performance_log(driver)
+
         # 提交表单
-        _submit_form(driver, wait)
+        _submit_form(driver)
 
-        # 等待 API Key 生成
+        # 等待并提取 API Key
         print("   → 等待 API Key 生成...")
-        time.sleep(3)
-
-        # 提取 API Key
-        api_key = _extract_api_key(driver)
+        api_key = None
+        if extraction == "network":
+            api_key = _capture_api_key_from_network(driver, known_keys)
+        if not api_key:
+            api_key = _extract_api_key(driver, known_keys)
         return api_key
 
     except Exception as e:
@@ -114,6 +124,7 @@ def _click_create_button(driver) -> Optional[str]:
         return None
 
 
+@timed("fill_api_key_name")
 def _fill_api_key_name(driver, wait) -> str:
     """
     填写 API Key 名称
@@ -125,6 +136,9 @@ def _fill_api_key_name(driver, wait) -> str:
     Returns:
         API Key 名称
     """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+
     print("   → 填写 API Key 名称...")
     name_input = wait.until(
         EC.presence_of_element_located((By.XPATH, "//input[@placeholder='Enter User API Key Name...']"))
@@ -138,25 +152,21 @@ def _fill_api_key_name(driver, wait) -> str:
     return api_key_name
 
 
-def _submit_form(driver, wait):
+@timed("submit_form", check=lambda _: True)
+def _submit_form(driver):
     """
     提交 API Key 创建表单
 
     Args:
         driver: Selenium WebDriver 实例
-        wait: WebDriverWait 实例
     """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.common.keys import Keys
+
     print("   → 点击保存按钮...")
     try:
-        # 尝试多种可能的按钮文本
-        save_button = None
-        for button_text in ["Save", "Create", "确认", "保存", "创建"]:
-            try:
-                save_button = driver.find_element(By.XPATH, f"//button[contains(text(), '{button_text}')]")
-                if save_button.is_displayed():
-                    break
-            except:
-                continue
+        # 一次查询所有可能的按钮文本
+        save_button = find_button(driver, "save_button", SAVE_BUTTON_LABELS, timeout=0)
 
         if save_button:
             save_button.click()
@@ -165,51 +175,49 @@ def _submit_form(driver, wait):
             name_input = driver.find_element(By.XPATH, "//input[@placeholder='Enter User API Key Name...']")
             name_input.send_keys(Keys.RETURN)
 
-        time.sleep(1)
-
     except Exception as e:
         print(f"   ⚠️  点击保存按钮失败，尝试按回车: {e}")
         name_input = driver.find_element(By.XPATH, "//input[@placeholder='Enter User API Key Name...']")
         name_input.send_keys(Keys.RETURN)
-        time.sleep(1)
 
 
-def _extract_api_key(driver) -> Optional[str]:
+@timed("extract_api_key")
+def _extract_api_key(driver, known_keys: Optional[List[str]] = None) -> Optional[str]:
     """
-    从页面中提取 API Key
+    从页面中提取新创建的 API Key
+
+    在浏览器内一次性遍历 DOM 文本和输入框，找不到时用 MutationObserver
+    等待其出现；整个过程只需一次 WebDriver 往返，与页面大小无关。
 
     Args:
         driver: Selenium WebDriver 实例
+        known_keys: 创建前页面上已有的 API Key，这些值会被忽略
 
     Returns:
         成功返回 API Key，失败返回 None
     """
+    known_keys = list(known_keys or [])
     api_key = None
 
-    # 方法1：从页面源代码中提取
+    # 方法1：页面内扫描并等待新 Key 出现
     try:
-        print("   → 从页面源代码提取...")
-        page_source = driver.page_source
-        matches = re.findall(r'key_[a-zA-Z0-9]{32,}', page_source)
-        if matches:
-            api_key = matches[0]
+        print("   → 在页面内查找 API Key...")
+        api_key = driver.execute_async_script(
+            _WAIT_FOR_NEW_KEY_SCRIPT, API_KEY_PATTERN, known_keys, int(DEFAULT_TIMEOUT * 1000)
+        )
+        if api_key:
             print(f"   ✅ 找到 API Key")
     except Exception as e:
-        print(f"   ⚠️  方法1失败: {e}")
+        print(f"   ⚠️  页面内查找失败: {e}")
 
-    # 方法2：查找所有可能包含 API Key 的元素（备用）
+    # 方法2：从页面源代码中提取（备用）
     if not api_key:
         try:
-            print("   → 查找文本元素（备用方法）...")
-            all_elements = driver.find_elements(By.XPATH, "//*[text()]")
-            for elem in all_elements:
-                text = elem.text.strip()
-                if 'key_' in text and len(text) > 20:
-                    match = re.search(r'key_[a-zA-Z0-9]{32,}', text)
-                    if match:
-                        api_key = match.group(0)
-                        print(f"   ✅ 找到 API Key（备用方法）")
-                        break
+            print("   → 从页面源代码提取（备用方法）...")
+            matches = [m for m in re.findall(API_KEY_PATTERN, driver.page_source) if m not in known_keys]
+            if matches:
+                api_key = matches[0]
+                print(f"   ✅ 找到 API Key（备用方法）")
         except Exception as e:
             print(f"   ⚠️  备用方法失败: {e}")
 
@@ -219,51 +227,188 @@ def _extract_api_key(driver) -> Optional[str]:
     return api_key
 
 
+@timed("capture_api_key")
+def _capture_api_key_from_network(driver, known_keys: Optional[List[str]] = None,
+                                  timeout: float = DEFAULT_TIMEOUT) -> Optional[str]:
+    """
+    从 Chrome 性能日志中读取创建请求的响应，直接拿到 API Key
+
+    跟踪提交后发出的 POST 请求，在其响应加载完成时通过 CDP
+    Network.getResponseBody 读取响应体，无需等待页面渲染。
+
+    Args:
+        driver: 启用了性能日志（goog:loggingPrefs）的 WebDriver 实例
+        known_keys: 已存在的 API Key，这些值会被忽略
+        timeout: 超时时间（秒）
+
+    Returns:
+        成功返回 API Key，失败或超时返回 None
+    """
+    known_keys = list(known_keys or [])
+    post_requests = set()
+    deadline = time.monotonic() + timeout
+
+    print("   → 从网络响应中读取 API Key...")
+    try:
+        while time.monotonic() < deadline:
+            for entry in driver.get_log('performance'):
+                message = json.loads(entry['message']).get('message', {})
+                method = message.get('method')
+                params = message.get('params', {})
+
+                if method == 'Network.requestWillBeSent':
+                    if params.get('request', {}).get('method') == 'POST':
+                        post_requests.add(params.get('requestId'))
+                elif method == 'Network.loadingFinished' and params.get('requestId') in post_requests:
+                    api_key = _read_api_key_from_response(driver, params['requestId'], known_keys)
+                    if api_key:
+                        print("   ✅ 从网络响应中找到 API Key")
+                        return api_key
+
+            time.sleep(POLL_FREQUENCY)
+    except Exception as e:
+        print(f"   ⚠️  读取网络日志失败，改为从页面提取: {e}")
+        return None
+
+    print("   ⚠️  未在网络响应中找到 API Key，改为从页面提取")
+    return None
+
+
+def _read_api_key_from_response(driver, request_id: str, known_keys: List[str]) -> Optional[str]:
+    """
+    通过 CDP 读取响应体并匹配 API Key
+
+    Args:
+        driver: WebDriver 实例
+        request_id: CDP 请求 ID
+        known_keys: 需要忽略的已有 API Key
+
+    Returns:
+        找到返回 API Key，否则返回 None
+    """
+    try:
+        response = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+    except Exception:
+        return None
+
+    body = response.get('body', '')
+    if response.get('base64Encoded'):
+        import base64
+        body = base64.b64decode(body).decode('utf-8', errors='replace')
+
+    for match in re.findall(API_KEY_PATTERN, body):
+        if match not in known_keys:
+            return match
+    return None
+
+
+def _drain_performance_log(driver):
+    """清空已缓冲的性能日志"""
+    try:
+        driver.get_log('performance')
+    except Exception:
+        pass
+
+
+def _snapshot_api_keys(driver) -> List[str]:
+    """
+    记录页面上已有的 API Key（一次 WebDriver 往返）
+
+    Args:
+        driver: Selenium WebDriver 实例
+
+    Returns:
+        API Key 列表，失败返回空列表
+    """
+    try:
+        return driver.execute_script(_COLLECT_KEYS_SCRIPT, API_KEY_PATTERN) or []
+    except Exception:
+        return []
+
+
+# 收集页面文本节点和输入框中所有匹配的 Key
+_COLLECT_KEYS_JS = """
+function collectKeys(source) {
+    var re = new RegExp(source, 'g');
+    var texts = [];
+    var root = document.body || document.documentElement;
+    var walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT);
+    var node;
+    while ((node = walker.nextNode())) {
+        texts.push(node.nodeValue);
+    }
+    var fields = document.querySelectorAll('input, textarea');
+    for (var i = 0; i < fields.length; i++) {
+        texts.push(fields[i].value || '');
+    }
+    return texts.join('\\n').match(re) || [];
+}
+"""
+
+_COLLECT_KEYS_SCRIPT = _COLLECT_KEYS_JS + "return collectKeys(arguments[0]);"
+
+# 扫描新 Key；没有则监听 DOM 变化（并轮询输入框的 value）直到出现或超时
+_WAIT_FOR_NEW_KEY_SCRIPT = _COLLECT_KEYS_JS + """
+var source = arguments[0], known = arguments[1], timeout = arguments[2];
+var done = arguments[arguments.length - 1];
+function scan() {
+    var keys = collectKeys(source);
+    for (var i = 0; i < keys.length; i++) {
+        if (known.indexOf(keys[i]) < 0) return keys[i];
+    }
+    return null;
+}
+var found = scan();
+if (found) {
+    done(found);
+} else {
+    var finished = false, observer, timer, poller;
+    var finish = function (value) {
+        if (finished) return;
+        finished = true;
+        observer.disconnect();
+        clearTimeout(timer);
+        clearInterval(poller);
+        done(value);
+    };
+    var check = function () {
+        var key = scan();
+        if (key) finish(key);
+    };
+    observer = new MutationObserver(check);
+    observer.observe(document, {childList: true, subtree: true, characterData: true});
+    poller = setInterval(check, 250);
+    timer = setTimeout(function () { finish(null); }, timeout);
+}
+"""
+
+
+@timed("write_zshrc")
 def update_zshrc_with_api_key(api_key: str) -> bool:
     """
     更新 ~/.zshrc 中的 CURSOR_API_KEY 环境变量
 
+    持有缓存目录中 zshrc.lock 上的 fcntl 排他锁，逐行流式写入同目录下的临时文件，
+    fsync 后用 os.replace 原子替换，并发写入不会互相覆盖或截断文件。
+    已导出的值与新值相同时不做任何写入。
+
     Args:
         api_key: API Key 字符串
 
     Returns:
         成功返回 True，失败返回 False
     """
+    # ~/.zshrc 可能是指向 dotfiles 仓库的符号链接，替换其指向的真实文件
+    rc_path = os.path.realpath(ZSHRC_PATH)
+    api_key_line = f'export {ENV_VAR_NAME}="{api_key}"\n'
+
     try:
-        # 读取现有内容
-        if os.path.exists(ZSHRC_PATH):
-            with open(ZSHRC_PATH, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-        else:
-            lines = []
-
-        # 查找并更新环境变量
-        api_key_line = f'export {ENV_VAR_NAME}="{api_key}"\n'
-        found = False
-        updated_lines = []
-
-        for line in lines:
-            # 如果找到已存在的环境变量，替换它
-            if line.strip().startswith(f'export {ENV_VAR_NAME}='):
-                updated_lines.append(api_key_line)
-                found = True
-                print(f"   → 更新现有的 {ENV_VAR_NAME}")
-            else:
-                updated_lines.append(line)
-
-        # 如果没找到，添加到文件末尾
-        if not found:
-            # 确保文件末尾有换行
-            if updated_lines and not updated_lines[-1].endswith('\n'):
-                updated_lines[-1] += '\n'
-            updated_lines.append('\n')
-            updated_lines.append(f'# Cursor API Key (自动添加)\n')
-            updated_lines.append(api_key_line)
-            print(f"   → 添加新的 {ENV_VAR_NAME}")
-
-        # 写回文件
-        with open(ZSHRC_PATH, 'w', encoding='utf-8') as f:
-            f.writelines(updated_lines)
+        with _rc_lock():
+            if _rc_is_current(rc_path, api_key_line):
+                print(f"   ✅ {ZSHRC_PATH} 中的 {ENV_VAR_NAME} 已是最新，无需写入")
+                return True
+
+            _rewrite_rc(rc_path, api_key_line)
 
         print(f"   ✅ 已写入 {ZSHRC_PATH}")
         print(f"   💡 运行 'source {ZSHRC_PATH}' 或重启终端以生效")
@@ -272,3 +417,113 @@ def update_zshrc_with_api_key(api_key: str) -> bool:
     except Exception as e:
         print(f"   ❌ 写入 {ZSHRC_PATH} 失败: {e}")
         return False
+
+
+@contextmanager
+def _rc_lock():
+    """
+    在 RC_LOCK_PATH 上持有 fcntl 排他锁（不支持 fcntl 的平台上不加锁）
+
+    锁文件放在缓存目录中并保留：释放后删除会让等待中的进程锁住已删除的文件，
+    与随后新建锁文件的进程同时写入。
+    """
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+
+    os.makedirs(os.path.dirname(RC_LOCK_PATH), mode=0o700, exist_ok=True)
+    with open(RC_LOCK_PATH, 'a') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _is_export_line(line: str) -> bool:
+    return line.strip().startswith(f'export {ENV_VAR_NAME}=')
+
+
+def _rc_is_current(rc_path: str, api_key_line: str) -> bool:
+    """
+    检查 rc 文件中的导出语句是否已全部是新值
+
+    Args:
+        rc_path: rc 文件路径
+        api_key_line: 新的 export 行
+
+    Returns:
+        已是最新返回 True
+    """
+    found = False
+    try:
+        with open(rc_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if _is_export_line(line):
+                    if line.strip() != api_key_line.strip():
+                        return False
+                    found = True
+    except FileNotFoundError:
+        return False
+    return found
+
+
+def _rewrite_rc(rc_path: str, api_key_line: str):
+    """
+    流式重写 rc 文件：替换已有的 export 行，没有则追加到末尾
+
+    Args:
+        rc_path: rc 文件路径
+        api_key_line: 新的 export 行
+    """
+    directory = os.path.dirname(rc_path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(rc_path)}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as out:
+            found = False
+            last_line = '\n'
+            try:
+                with open(rc_path, 'r', encoding='utf-8') as src:
+                    os.chmod(tmp_path, stat.S_IMODE(os.fstat(src.fileno()).st_mode))
+                    for line in src:
+                        if _is_export_line(line):
+                            line = api_key_line
+                            if not found:
+                                print(f"   → 更新现有的 {ENV_VAR_NAME}")
+                            found = True
+                        out.write(line)
+                        last_line = line
+            except FileNotFoundError:
+                os.chmod(tmp_path, 0o644)
+
+            # 如果没找到，添加到文件末尾
+            if not found:
+                if not last_line.endswith('\n'):
+                    out.write('\n')
+                out.write('\n')
+                out.write('# Cursor API Key (自动添加)\n')
+                out.write(api_key_line)
+                print(f"   → 添加新的 {ENV_VAR_NAME}")
+
+            out.flush()
+            os.fsync(out.fileno())
+
+        os.replace(tmp_path, rc_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    # 确保目录项的更新也已落盘
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
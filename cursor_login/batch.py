@@ -0,0 +1,203 @@
+"""
+批量登录模块
+从账户文件读取多个账户，使用有界线程池并发执行登录流程
+"""
+
+import csv
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+from .config import (
+    BATCH_PARALLELISM,
+    BATCH_RESULTS_PATH,
+    LOGIN_BACKEND,
+    API_KEY_EXTRACTION,
+    API_KEY_REUSE,
+    BROWSER_PROFILE,
+    PERSISTENT_PROFILE,
+    SESSION_SNAPSHOT,
+    SHARE_CHROMEDRIVER
+)
+from .database import get_cursor_token, build_account_info
+from .timing import span
+
+
+def load_accounts(path: str) -> List[Dict[str, str]]:
+    """
+    读取账户文件
+
+    文件为带表头的 CSV，支持的列：
+        email    用户邮箱（使用 token 列时必填）
+        token    Refresh Token
+        db_path  Cursor 数据库路径（与 token 二选一）
+
+    以 # 开头的行视为注释。
+
+    Args:
+        path: 账户文件路径
+
+    Returns:
+        账户行列表
+    """
+    with open(os.path.expanduser(path), 'r', encoding='utf-8', newline='') as f:
+        lines = [line for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+    accounts = []
+    for row in csv.DictReader(lines):
+        account = {k.strip(): (v or '').strip() for k, v in row.items() if k}
+        if account.get('token') or account.get('db_path'):
+            accounts.append(account)
+    return accounts
+
+
+def resolve_account(account: Dict[str, str]) -> Optional[Dict[str, str]]:
+    """
+    将账户行解析为登录所需的用户信息
+
+    Args:
+        account: load_accounts 返回的账户行
+
+    Returns:
+        用户信息字典，失败返回 None
+    """
+    if account.get('token'):
+        return build_account_info(account.get('email') or 'unknown', account['token'])
+
+    info = get_cursor_token(os.path.expanduser(account['db_path']))
+    if info and account.get('email'):
+        info['email'] = account['email']
+    return info
+
+
+def run_batch(accounts_path: str, parallelism: int = BATCH_PARALLELISM,
+              headless: bool = True, output_path: str = BATCH_RESULTS_PATH,
+              backend: str = LOGIN_BACKEND,
+              extraction: str = API_KEY_EXTRACTION,
+              profile: str = BROWSER_PROFILE,
+              reuse_key: bool = API_KEY_REUSE,
+              persistent_profile: bool = PERSISTENT_PROFILE,
+              contexts: bool = False,
+              session_snapshot: bool = SESSION_SNAPSHOT) -> Dict[str, Any]:
+    """
+    并发执行多个账户的登录流程
+
+    Args:
+        accounts_path: 账户文件路径
+        parallelism: 最大并发数
+        headless: 是否使用无头模式
+        output_path: 结果文件路径（JSON Lines，每个账户一行）
+        backend: 登录后端，"selenium" 或 "http"
+        extraction: API Key 提取方式，"dom" 或 "network"
+        profile: 浏览器配置档，"default" 或 "lean"
+        reuse_key: 已记录的 API Key 仍然有效时复用，跳过浏览器
+        persistent_profile: 每个账户使用独立的持久化 Chrome 用户数据目录
+                            （此时不使用会话池，每个账户单独启动浏览器）
+        contexts: 只启动一个无头 Chrome，每个账户使用其中独立的浏览器上下文
+        session_snapshot: 恢复并保存每个账户的会话快照
+
+    Returns:
+        汇总字典，包括 total, succeeded, failed, invalid_tokens, elapsed, logins_per_minute
+    """
+    from .browser import login_account
+    from .driver_service import shared_chromedriver
+    from .contexts import ContextPool
+    from .pool import DriverPool
+
+    accounts = load_accounts(accounts_path)
+    parallelism = max(1, min(parallelism, len(accounts) or 1))
+
+    print(f"\n📦 批量模式：{len(accounts)} 个账户，并发数 {parallelism}")
+
+    output_path = os.path.expanduser(output_path)
+    write_lock = threading.Lock()
+    results = []
+
+    # 结果中包含 API Key，仅允许当前用户读写
+    fd = os.open(output_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    out = os.fdopen(fd, 'w', encoding='utf-8')
+
+    def _run(index: int, account: Dict[str, str]) -> Dict[str, Any]:
+        started = time.monotonic()
+        with span("account", index=index, email=account.get('email')) as s:
+            info = resolve_account(account)
+            if not info:
+                result = {
+                    'email': account.get('email'),
+                    'success': False,
+                    'api_key': None,
+                    'invalid_token': False,
+                    'error': "无法获取账户信息"
+                }
+            else:
+                result = login_account(info, headless=headless, pool=pool,
+                                       update_env=False, backend=backend,
+                                       extraction=extraction, profile=profile,
+                                       reuse_key=reuse_key,
+                                       persistent_profile=persistent_profile,
+                                       session_snapshot=session_snapshot)
+            if not result['success']:
+                s.fail()
+
+        result['index'] = index
+        result['elapsed'] = round(time.monotonic() - started, 3)
+
+        with write_lock:
+            out.write(json.dumps(result, ensure_ascii=False) + '\n')
+            out.flush()
+        return result
+
+    # 所有浏览器（包括会话池中的）共用一个 chromedriver
+    chromedriver = shared_chromedriver() if SHARE_CHROMEDRIVER and backend != "http" else nullcontext()
+    pool = None
+
+    started = time.monotonic()
+    try:
+        with chromedriver:
+            if headless and not persistent_profile:
+                pool_class = ContextPool if contexts else DriverPool
+                pool = pool_class(size=parallelism, capture_network=(extraction == "network"),
+                                  profile=profile)
+            try:
+                # 会话池在第一个需要浏览器的账户借用时才在后台预启动，
+                # 走 HTTP 通道或复用已有 Key 的账户不会触发任何浏览器启动
+                with ThreadPoolExecutor(max_workers=parallelism) as executor:
+                    futures = [executor.submit(_run, i, account) for i, account in enumerate(accounts)]
+                    for future in as_completed(futures):
+                        results.append(future.result())
+                        if pool is not None:
+                            # 剩余账户不再需要那么多浏览器时，空闲超时的浏览器不必等到批次结束
+                            pool.evict_idle()
+            finally:
+                if pool is not None:
+                    pool.close()
+    finally:
+        out.close()
+
+    elapsed = time.monotonic() - started
+    succeeded = sum(1 for r in results if r['success'])
+    summary = {
+        'total': len(results),
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+        'invalid_tokens': sum(1 for r in results if r.get('invalid_token')),
+        'elapsed': round(elapsed, 3),
+        'logins_per_minute': round(len(results) / elapsed * 60, 2) if elapsed > 0 else 0.0
+    }
+
+    print("\n" + "="*60)
+    print("📊 批量登录结果")
+    print("="*60)
+    print(f"✅ 成功: {summary['succeeded']}/{summary['total']}")
+    if summary['invalid_tokens']:
+        print(f"⛔ Token 预检失败（未启动浏览器）: {summary['invalid_tokens']}")
+    print(f"⏱️  总耗时: {summary['elapsed']} 秒")
+    print(f"🚀 吞吐量: {summary['logins_per_minute']} 次登录/分钟")
+    print(f"📝 结果文件: {output_path}")
+    print("="*60)
+
+    return summary
@@ -3,44 +3,158 @@
 使用 Selenium 实现自动登录和操作
 """
 
-import time
+import importlib.util
+import os
+import re
 import subprocess
 import sys
-from typing import Dict, Optional
+import time
+from typing import Any, Dict, Optional, Sequence
 
 from .config import (
     CURSOR_WEBSITE,
     CURSOR_DASHBOARD,
+    CURSOR_INTEGRATIONS,
     COOKIE_NAME,
     COOKIE_DOMAIN,
     COOKIE_PATH,
-    DEFAULT_WINDOW_SIZE
+    COOKIE_MAX_AGE,
+    DEFAULT_WINDOW_SIZE,
+    AUTHENTICATOR_HOST,
+    LOGIN_BACKEND,
+    API_KEY_EXTRACTION,
+    API_KEY_REUSE,
+    BROWSER_PROFILE,
+    LEAN_BLOCKED_URLS,
+    PERSISTENT_PROFILE,
+    PROFILE_DIR,
+    SESSION_SNAPSHOT
 )
 from .api_key import create_api_key, update_zshrc_with_api_key
+from .credentials import find_reusable_api_key, record_api_key
+from .database import validate_token
+from .driver_service import (
+    create_service,
+    invalidate_paths,
+    remote_chrome,
+    resolve_paths,
+    shared_service
+)
+from .roundtrips import maybe_instrument
+from .snapshot import (
+    discard_snapshot,
+    forget_restore_script,
+    load_snapshot,
+    restore_snapshot,
+    save_snapshot
+)
+from .timing import span, timed, note_retry
+from .waits import is_dashboard_url, navigate, wait_for_page_ready, wait_for_dashboard
 
 
-def auto_login_with_selenium(info: Dict[str, str], headless: bool = True) -> bool:
+def auto_login_with_selenium(info: Dict[str, str], headless: bool = True, pool=None) -> bool:
     """
     使用 Selenium 自动登录 Cursor
 
     Args:
         info: 包含用户信息的字典，包括 email, token, user_id, expiry
         headless: 是否使用无头模式（默认 True）
+        pool: 可选的 DriverPool，提供时从池中借用浏览器并在结束后归还
 
     Returns:
         成功返回 True，失败返回 False
     """
+    return login_account(info, headless=headless, pool=pool)['success']
+
+
+@timed("login_account", check=lambda result: result['success'])
+def login_account(info: Dict[str, str], headless: bool = True, pool=None,
+                  update_env: bool = True, backend: str = LOGIN_BACKEND,
+                  extraction: str = API_KEY_EXTRACTION,
+                  profile: str = BROWSER_PROFILE,
+                  reuse_key: bool = API_KEY_REUSE,
+                  persistent_profile: bool = PERSISTENT_PROFILE,
+                  session_snapshot: bool = SESSION_SNAPSHOT,
+                  token_checked: bool = False) -> Dict[str, Any]:
+    """
+    执行单个账户的完整登录流程：设置 Cookie、验证登录、创建 API Key
+
+    Args:
+        info: 包含用户信息的字典，包括 email, token, user_id, expiry
+        headless: 是否使用无头模式（默认 True）
+        pool: 可选的 DriverPool，提供时从池中借用浏览器并在结束后归还
+        update_env: 是否将 API Key 写入 ~/.zshrc（批量模式下关闭）
+        backend: "selenium" 或 "http"；"http" 时先尝试纯 HTTP 快速通道，
+                 失败后回退到浏览器流程
+        extraction: API Key 提取方式，"dom" 或 "network"
+        profile: 浏览器配置档，"default" 或 "lean"
+        reuse_key: 本工具此前为该账户创建的 API Key 仍然有效时直接复用；
+                   无头模式下因此完全跳过浏览器
+        persistent_profile: 使用该账户跨运行保留的 Chrome 用户数据目录；
+                            会话仍然有效时跳过清理、设置和验证 Cookie（不使用会话池时生效）
+        session_snapshot: 恢复上次保存的会话快照并直接打开 Integrations 页面，
+                          完整登录成功后保存新的快照
+        token_checked: 调用方已用 validate_token 预检过该 Token 时为 True，跳过重复检查
+
+    Returns:
+        结果字典，格式：
+        {
+            'email': str,              # 用户邮箱
+            'success': bool,           # 是否登录成功
+            'api_key': Optional[str],  # 创建或复用的 API Key
+            'reused': bool,            # API Key 是否为复用的已有 Key
+            'invalid_token': bool,     # 是否因 Token 预检失败而未登录
+            'error': Optional[str]     # 失败原因
+        }
+    """
+    result = {
+        'email': info.get('email'),
+        'success': False,
+        'api_key': None,
+        'reused': False,
+        'invalid_token': False,
+        'error': None
+    }
+
+    # Token 预检：过期或格式错误的 Token 不必启动浏览器
+    problem = None if token_checked else validate_token(info.get('token'))
+    if problem:
+        print(f"\n❌ Token 预检失败: {problem}")
+        result['invalid_token'] = True
+        result['error'] = f"Token 无效: {problem}"
+        return result
+
+    # 已有的 API Key 仍然有效时无需创建新 Key
+    reusable_key = find_reusable_api_key(info) if reuse_key else None
+    if reusable_key and headless:
+        result['success'] = True
+        result['reused'] = True
+        result['api_key'] = _export_api_key(reusable_key, update_env, created=False)
+        return result
+
+    # HTTP 快速通道（仅无头模式，可视化模式需要真实浏览器）
+    if backend == "http" and headless:
+        from .http_backend import login_via_http
+
+        api_key = login_via_http(info)
+        if api_key:
+            record_api_key(info, api_key)
+            result['success'] = True
+            result['api_key'] = _export_api_key(api_key, update_env)
+            return result
+        print("   🔄 回退到浏览器流程...")
+
     # 确保 Selenium 已安装
     if not _ensure_selenium_installed():
-        return False
+        result['error'] = "Selenium 未安装"
+        return result
 
-    # 导入 Selenium
-    try:
-        from selenium import webdriver
-        from selenium.webdriver.chrome.options import Options
-    except ImportError:
+    # 刚安装的 Selenium 需要刷新导入缓存后才能找到（实际导入在 _create_driver 中按需进行）
+    importlib.invalidate_caches()
+    if importlib.util.find_spec("selenium") is None:
         print("❌ 安装后仍无法导入，请手动重新运行脚本")
-        return False
+        result['error'] = "无法导入 Selenium"
+        return result
 
     print("\n🚀 开始自动登录流程...")
     if headless:
@@ -48,38 +162,203 @@ def auto_login_with_selenium(info: Dict[str, str], headless: bool = True) -> boo
     else:
         print("   💡 可视化模式：显示浏览器界面")
 
-    # 配置浏览器
-    chrome_options = _configure_chrome_options(headless)
-
     driver = None
 
     try:
         # 启动浏览器
-        print("1️⃣ 启动浏览器...")
-        driver = webdriver.Chrome(options=chrome_options)
-
-        # 设置 Cookie 并登录
-        if not _set_login_cookie(driver, info):
-            if driver and headless:
-                driver.quit()
-            return False
-
-        # 验证登录状态
-        if not _verify_login(driver, info, headless):
-            if driver and headless:
-                driver.quit()
-            return False
+        if pool is not None:
+            print("1️⃣ 从会话池获取浏览器...")
+            with span("pool_acquire"):
+                driver = pool.acquire()
+        else:
+            print("1️⃣ 启动浏览器...")
+            user_data_dir = _profile_dir(info) if persistent_profile else None
+            driver = _create_driver(headless, capture_network=(extraction == "network"),
+                                    profile=profile, user_data_dir=user_data_dir)
 
-        return True
+        return _run_login_steps(driver, info, result, headless, update_env, extraction,
+                                api_key=reusable_key,
+                                reuse_session=persistent_profile and pool is None,
+                                session_snapshot=session_snapshot)
 
     except Exception as e:
         print(f"\n❌ 自动登录失败: {e}")
         import traceback
         traceback.print_exc()
-        if driver and headless:
+        result['error'] = str(e)
+        return result
+
+    finally:
+        _release_driver(driver, headless, pool)
+
+
+def _run_login_steps(driver, info: Dict[str, str], result: Dict[str, Any], headless: bool = True,
+                     update_env: bool = True, extraction: str = API_KEY_EXTRACTION,
+                     api_key: Optional[str] = None,
+                     reuse_session: bool = False,
+                     session_snapshot: bool = False) -> Dict[str, Any]:
+    """
+    在已启动的浏览器中设置 Cookie、验证登录并创建 API Key
+
+    Args:
+        driver: Selenium WebDriver 实例
+        info: 用户信息字典
+        result: login_account 的结果字典，原地更新
+        headless: 是否为无头模式
+        update_env: 是否将 API Key 写入 ~/.zshrc
+        extraction: API Key 提取方式，"dom" 或 "network"
+        api_key: 可复用的已有 API Key，提供时不再创建新 Key
+        reuse_session: 浏览器使用持久化用户数据目录时，先尝试复用其中的会话
+        session_snapshot: 先尝试恢复会话快照，完整登录成功后保存快照
+
+    Returns:
+        更新后的结果字典
+    """
+    restored = False
+    if not (reuse_session and _reuse_session(driver, info)):
+        # 恢复会话快照，成功时浏览器已停留在 Integrations 页面
+        restored = session_snapshot and _restore_session(driver, info)
+        if not restored:
+            # 设置 Cookie 并登录
+            if not _set_login_cookie(driver, info):
+                result['error'] = "Cookie 设置失败"
+                return result
+
+            # 验证登录状态
+            if not _verify_login(driver, info, headless):
+                result['error'] = "登录验证失败"
+                return result
+
+            # _verify_login 无法确认时也会放行；只保存确实停留在 Dashboard 的会话
+            if session_snapshot and _on_dashboard(driver):
+                save_snapshot(driver, info)
+
+    result['success'] = True
+
+    if api_key:
+        result['reused'] = True
+        result['api_key'] = _export_api_key(api_key, update_env, created=False)
+        return result
+
+    # 创建 API Key
+    result['api_key'] = _create_and_export_api_key(driver, update_env, extraction,
+                                                   open_page=not restored)
+    if result['api_key']:
+        record_api_key(info, result['api_key'])
+    return result
+
+
+@timed("launch_browser")
+def _create_driver(headless: bool, capture_network: bool = False,
+                   profile: str = BROWSER_PROFILE, user_data_dir: Optional[str] = None,
+                   extra_args: Sequence[str] = ()):
+    """
+    启动一个新的 Chrome 浏览器
+
+    Args:
+        headless: 是否使用无头模式
+        capture_network: 是否启用性能日志（用于从网络响应中读取 API Key）
+        profile: 浏览器配置档，"default" 或 "lean"
+        user_data_dir: 持久化的 Chrome 用户数据目录，默认使用临时目录
+        extra_args: 额外的 Chrome 命令行参数
+
+    Returns:
+        Selenium WebDriver 实例；存在共享 chromedriver 时连接到它，
+        否则使用磁盘缓存的路径单独启动 chromedriver
+    """
+    from selenium import webdriver
+    from selenium.common.exceptions import SessionNotCreatedException
+
+    lean = headless and profile == "lean"
+    chrome_options = _configure_chrome_options(headless, capture_network, lean)
+    if user_data_dir:
+        os.makedirs(user_data_dir, mode=0o700, exist_ok=True)
+        chrome_options.add_argument(f'--user-data-dir={user_data_dir}')
+    for arg in extra_args:
+        chrome_options.add_argument(arg)
+
+    # 使用缓存的路径，避免每次启动都由 Selenium Manager 重新查找
+    browser_path = resolve_paths(chrome_options)['browser_path']
+    if browser_path and not chrome_options.binary_location:
+        chrome_options.binary_location = browser_path
+
+    service = shared_service()
+    try:
+        if service is not None:
+            driver = remote_chrome(service, chrome_options)
+        else:
+            driver = webdriver.Chrome(service=create_service(), options=chrome_options)
+    except SessionNotCreatedException as e:
+        # 缓存的 chromedriver 与 Chrome 版本不匹配（如 Chrome 运行期间自动更新）：
+        # 重新查找一次（共享的 chromedriver 随之用新路径重启）后重试
+        print(f"   ⚠️  无法创建浏览器会话，重新查找 chromedriver: {e.msg}")
+        invalidate_paths(stale_service=service)
+        browser_path = resolve_paths(chrome_options)['browser_path']
+        if browser_path:
+            chrome_options.binary_location = browser_path
+        service = shared_service()
+        if service is not None:
+            driver = remote_chrome(service, chrome_options)
+        else:
+            driver = webdriver.Chrome(service=create_service(), options=chrome_options)
+    maybe_instrument(driver)
+    if lean:
+        _block_heavy_resources(driver)
+    return driver
+
+
+def _block_heavy_resources(driver):
+    """
+    通过 CDP 屏蔽图片、字体和第三方统计脚本的请求
+
+    Args:
+        driver: Selenium WebDriver 实例
+    """
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': LEAN_BLOCKED_URLS})
+    except Exception as e:
+        print(f"   ⚠️  无法设置资源屏蔽: {e}")
+
+
+def _profile_dir(info: Dict[str, str]) -> str:
+    """
+    账户专属的 Chrome 用户数据目录
+
+    Args:
+        info: 用户信息字典
+
+    Returns:
+        PROFILE_DIR 下以 User ID 命名的目录
+    """
+    name = re.sub(r'[^A-Za-z0-9_-]', '_', info.get('user_id') or 'unknown')
+    return os.path.join(PROFILE_DIR, name)
+
+
+def _release_driver(driver, headless: bool, pool=None):
+    """
+    登录结束后处理浏览器：归还会话池、关闭或保持打开
+
+    Args:
+        driver: Selenium WebDriver 实例（可能为 None）
+        headless: 是否为无头模式
+        pool: 可选的 DriverPool
+    """
+    if driver is None:
+        return
+
+    if pool is not None:
+        pool.release(driver)
+        print("\n♻️  浏览器已归还会话池")
+    elif headless:
+        print("\n🔚 关闭浏览器...")
+        try:
             driver.quit()
-            print("✅ 浏览器已关闭")
-        return False
+        except Exception:
+            pass
+        print("   ✅ 浏览器已关闭")
+    else:
+        print("\n✅ 浏览器将保持打开状态，可以继续使用")
 
 
 def _ensure_selenium_installed() -> bool:
@@ -104,12 +383,14 @@ def _ensure_selenium_installed() -> bool:
             return False
 
 
-def _configure_chrome_options(headless: bool):
+def _configure_chrome_options(headless: bool, capture_network: bool = False, lean: bool = False):
     """
     配置 Chrome 浏览器选项
 
     Args:
         headless: 是否使用无头模式
+        capture_network: 是否启用性能日志（记录 CDP Network.* 事件）
+        lean: 是否使用精简配置（不加载图片、关闭扩展和后台网络、eager 加载策略）
 
     Returns:
         Chrome Options 对象
@@ -131,13 +412,114 @@ def _configure_chrome_options(headless: bool):
         chrome_options.add_argument('--start-maximized')
         chrome_options.add_experimental_option("detach", True)
 
+    if lean:
+        # 精简配置：DOMContentLoaded 即返回，不等待图片等子资源
+        chrome_options.page_load_strategy = 'eager'
+        chrome_options.add_argument('--disable-extensions')
+        chrome_options.add_argument('--disable-component-update')
+        chrome_options.add_argument('--disable-background-networking')
+        chrome_options.add_argument('--disable-default-apps')
+        chrome_options.add_argument('--disable-sync')
+        chrome_options.add_argument('--mute-audio')
+        chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+        chrome_options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2
+        })
+
+    if capture_network:
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
     return chrome_options
 
 
+@timed("reuse_session")
+def _reuse_session(driver, info: Dict[str, str]) -> bool:
+    """
+    复用持久化用户数据目录中的会话
+
+    已保存的会话 Cookie 与当前 Token 一致，且打开 Dashboard 时没有被重定向到
+    认证页面，即可跳过清理、设置和验证 Cookie 的步骤。
+
+    Args:
+        driver: 使用持久化用户数据目录启动的 WebDriver 实例
+        info: 用户信息字典
+
+    Returns:
+        会话可用返回 True，否则返回 False（由调用方走完整流程）
+    """
+    cookie_value = f"{info['user_id']}::{info['token']}"
+    try:
+        cookies = driver.execute_cdp_cmd("Network.getCookies", {'urls': [CURSOR_DASHBOARD]})
+    except Exception:
+        return False
+
+    stored = next((c for c in cookies.get('cookies', []) if c['name'] == COOKIE_NAME), None)
+    if not stored or stored.get('value') != cookie_value:
+        print("2️⃣ 浏览器配置中没有当前 Token 的会话，重新设置...")
+        return False
+
+    print("2️⃣ 复用浏览器配置中的会话...")
+    navigate(driver, CURSOR_DASHBOARD)
+    current_url = wait_for_dashboard(driver)
+    if AUTHENTICATOR_HOST in current_url or "dashboard" not in current_url:
+        print("   ⚠️  会话已失效，重新设置 Cookie")
+        return False
+
+    print("✅ 会话有效，已跳过 Cookie 设置和验证")
+    return True
+
+
+@timed("restore_session")
+def _restore_session(driver, info: Dict[str, str]) -> bool:
+    """
+    恢复会话快照并直接打开 Integrations 页面
+
+    Args:
+        driver: 尚未导航的 WebDriver 实例
+        info: 用户信息字典
+
+    Returns:
+        会话可用返回 True，否则返回 False（由调用方走完整流程）
+    """
+    snapshot = load_snapshot(info)
+    if snapshot is None:
+        return False
+
+    print("2️⃣ 恢复会话快照，直接打开 Integrations 页面...")
+    try:
+        script_id = restore_snapshot(driver, snapshot)
+    except Exception as e:
+        print(f"   ⚠️  无法恢复会话快照: {e}")
+        return False
+
+    navigate(driver, CURSOR_INTEGRATIONS)
+    current_url = wait_for_dashboard(driver)
+    forget_restore_script(driver, script_id)
+    if AUTHENTICATOR_HOST in current_url or "dashboard" not in current_url:
+        print("   ⚠️  会话快照已失效，重新设置 Cookie")
+        discard_snapshot(info)
+        return False
+
+    print("✅ 会话快照有效，已跳过 Cookie 设置和验证")
+    return True
+
+
+def _on_dashboard(driver) -> bool:
+    """浏览器当前是否停留在 Dashboard（而不是认证页面或其他页面）"""
+    try:
+        return is_dashboard_url(driver.current_url)
+    except Exception:
+        return False
+
+
+@timed("set_login_cookie")
 def _set_login_cookie(driver, info: Dict[str, str]) -> bool:
     """
     设置登录 Cookie
 
+    优先通过 CDP 在首次导航之前注入 Cookie，这样第一次页面加载就是
+    Dashboard 本身；CDP 不可用时回退到先访问 cursor.com 再设置的方式。
+
     Args:
         driver: Selenium WebDriver 实例
         info: 用户信息字典
@@ -145,10 +527,73 @@ def _set_login_cookie(driver, info: Dict[str, str]) -> bool:
     Returns:
         成功返回 True，失败返回 False
     """
+    cookie_value = f"{info['user_id']}::{info['token']}"
+
+    cursor_cookie = _set_login_cookie_via_cdp(driver, cookie_value)
+    if cursor_cookie is None:
+        cursor_cookie = _set_login_cookie_via_page(driver, info, cookie_value)
+
+    if cursor_cookie:
+        print("✅ Cookie 设置成功！")
+        print(f"   Cookie 值: {cursor_cookie['value'][:50]}...")
+        return True
+    else:
+        print("❌ Cookie 设置失败")
+        print("可能原因：浏览器阻止了 Cookie")
+        return False
+
+
+def _set_login_cookie_via_cdp(driver, cookie_value: str) -> Optional[Dict[str, Any]]:
+    """
+    通过 CDP Network.setCookie 在导航前设置 Cookie
+
+    Args:
+        driver: Selenium WebDriver 实例
+        cookie_value: Cookie 值
+
+    Returns:
+        设置后的 Cookie 字典；CDP 不可用或设置失败时返回 None
+    """
+    try:
+        print("2️⃣ 清理旧的登录状态（CDP）...")
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+
+        print("3️⃣ 设置新的登录 Token（CDP）...")
+        driver.execute_cdp_cmd("Network.setCookie", {
+            'name': COOKIE_NAME,
+            'value': cookie_value,
+            'domain': COOKIE_DOMAIN,
+            'path': COOKIE_PATH,
+            'secure': True,
+            'sameSite': 'None',
+            'httpOnly': False,
+            'expires': time.time() + COOKIE_MAX_AGE
+        })
+
+        print("4️⃣ 验证 Cookie...")
+        cookies = driver.execute_cdp_cmd("Network.getCookies", {'urls': [CURSOR_DASHBOARD]})
+        return next((c for c in cookies.get('cookies', []) if c['name'] == COOKIE_NAME), None)
+    except Exception as e:
+        print(f"   ⚠️  CDP 设置失败，改为访问页面后设置: {e}")
+        return None
+
+
+def _set_login_cookie_via_page(driver, info: Dict[str, str], cookie_value: str) -> Optional[Dict[str, Any]]:
+    """
+    先访问 cursor.com，再通过 Selenium（或 JavaScript）设置 Cookie
+
+    Args:
+        driver: Selenium WebDriver 实例
+        info: 用户信息字典
+        cookie_value: Cookie 值
+
+    Returns:
+        设置后的 Cookie 字典，失败返回 None
+    """
     # 访问主域名
     print("2️⃣ 访问 cursor.com...")
-    driver.get(CURSOR_WEBSITE)
-    time.sleep(1)
+    navigate(driver, CURSOR_WEBSITE)
+    wait_for_page_ready(driver)
 
     # 清理旧 Cookie
     print("3️⃣ 清理旧的登录状态...")
@@ -156,8 +601,6 @@ def _set_login_cookie(driver, info: Dict[str, str]) -> bool:
 
     # 设置新 Cookie
     print("4️⃣ 设置新的登录 Token...")
-    cookie_value = f"{info['user_id']}::{info['token']}"
-
     try:
         driver.add_cookie({
             'name': COOKIE_NAME,
@@ -174,27 +617,19 @@ def _set_login_cookie(driver, info: Dict[str, str]) -> bool:
         # 备用方案：使用 JavaScript
         cookie_value_encoded = f"{info['user_id']}%3A%3A{info['token']}"
         driver.execute_script(f"""
-            document.cookie = "{COOKIE_NAME}={cookie_value_encoded}; domain={COOKIE_DOMAIN}; path={COOKIE_PATH}; secure; SameSite=None; max-age=5184000";
+            document.cookie = "{COOKIE_NAME}={cookie_value_encoded}; domain={COOKIE_DOMAIN}; path={COOKIE_PATH}; secure; SameSite=None; max-age={COOKIE_MAX_AGE}";
         """)
 
     # 验证 Cookie 是否设置成功
     print("5️⃣ 验证登录状态...")
     cookies = driver.get_cookies()
-    cursor_cookie = next((c for c in cookies if c['name'] == COOKIE_NAME), None)
-
-    if cursor_cookie:
-        print("✅ Cookie 设置成功！")
-        print(f"   Cookie 值: {cursor_cookie['value'][:50]}...")
-        return True
-    else:
-        print("❌ Cookie 设置失败")
-        print("可能原因：浏览器阻止了 Cookie")
-        return False
+    return next((c for c in cookies if c['name'] == COOKIE_NAME), None)
 
 
+@timed("verify_login")
 def _verify_login(driver, info: Dict[str, str], headless: bool) -> bool:
     """
-    验证登录状态并创建 API Key
+    跳转到 Dashboard 并验证登录状态
 
     Args:
         driver: Selenium WebDriver 实例
@@ -206,31 +641,29 @@ def _verify_login(driver, info: Dict[str, str], headless: bool) -> bool:
     """
     # 跳转到 Dashboard
     print("6️⃣ 跳转到 Dashboard...")
-    driver.get(CURSOR_DASHBOARD)
-    time.sleep(2)
+    navigate(driver, CURSOR_DASHBOARD)
 
     # 检查登录状态
     print("7️⃣ 检查登录状态...")
     try:
-        current_url = driver.current_url
+        current_url = wait_for_dashboard(driver)
         print(f"   当前 URL: {current_url}")
 
         # 如果跳转到认证页面，尝试重新设置
-        if "authenticator.cursor.sh" in current_url:
+        if AUTHENTICATOR_HOST in current_url:
             print("⚠️  页面跳转到了认证页面，Cookie 可能未生效")
             print("🔄 尝试重新设置并跳转...")
+            note_retry()
 
-            driver.get(CURSOR_WEBSITE)
-            time.sleep(1)
-
-            driver.get(CURSOR_DASHBOARD)
-            time.sleep(2)
+            navigate(driver, CURSOR_WEBSITE)
+            wait_for_page_ready(driver)
 
-            current_url = driver.current_url
+            navigate(driver, CURSOR_DASHBOARD)
+            current_url = wait_for_dashboard(driver)
             print(f"   新 URL: {current_url}")
 
         # 检查是否成功登录
-        if "dashboard" in current_url and "authenticator" not in current_url:
+        if "dashboard" in current_url and AUTHENTICATOR_HOST not in current_url:
             print("✅ 成功跳转到 Dashboard！")
         else:
             print(f"⚠️  当前页面: {current_url}")
@@ -242,43 +675,64 @@ def _verify_login(driver, info: Dict[str, str], headless: bool) -> bool:
         print(f"⏰ Token 过期时间: {info['expiry']}")
         print("="*60)
 
-        # 创建 API Key
-        api_key = create_api_key(driver)
-        if api_key:
-            print("\n" + "="*60)
-            print("🔑 API Key 已创建")
-            print("="*60)
-            print(f"📝 API Key: {api_key}")
-            print("="*60)
-            print("\n💡 此 API Key 可用于 Cursor CLI 和 API 调用")
-
-            # 写入到 ~/.zshrc
-            print("\n🔟 写入环境变量...")
-            update_zshrc_with_api_key(api_key)
-        else:
-            print("\n⚠️  API Key 创建失败，请手动创建")
-
-        # 根据模式决定是否关闭浏览器
-        if headless:
-            print("\n🔚 关闭浏览器...")
-            driver.quit()
-            print("   ✅ 浏览器已关闭")
-        else:
-            print("\n✅ 浏览器将保持打开状态，可以继续使用")
-
         return True
 
     except Exception as e:
         print(f"⚠️  无法验证登录状态: {e}")
         print("但 Cookie 已设置")
-        if driver and headless:
-            driver.quit()
-            print("✅ 浏览器已关闭")
-        elif not headless:
-            print("✅ 浏览器将保持打开状态")
         return True
 
 
+def _create_and_export_api_key(driver, update_env: bool = True,
+                               extraction: str = API_KEY_EXTRACTION,
+                               open_page: bool = True) -> Optional[str]:
+    """
+    创建 API Key 并（可选）写入环境变量
+
+    Args:
+        driver: Selenium WebDriver 实例
+        update_env: 是否写入 ~/.zshrc
+        extraction: API Key 提取方式，"dom" 或 "network"
+        open_page: 是否先跳转到 Integrations 页面（已在该页面时传 False）
+
+    Returns:
+        成功返回 API Key，失败返回 None
+    """
+    api_key = create_api_key(driver, extraction, open_page)
+    if api_key:
+        return _export_api_key(api_key, update_env)
+
+    print("\n⚠️  API Key 创建失败，请手动创建")
+    return None
+
+
+def _export_api_key(api_key: str, update_env: bool = True, created: bool = True) -> str:
+    """
+    打印 API Key 并（可选）写入环境变量
+
+    Args:
+        api_key: API Key 字符串
+        update_env: 是否写入 ~/.zshrc
+        created: 是否为新创建的 Key（否则为复用的已有 Key）
+
+    Returns:
+        传入的 API Key
+    """
+    print("\n" + "="*60)
+    print("🔑 API Key 已创建" if created else "🔑 复用已有 API Key")
+    print("="*60)
+    print(f"📝 API Key: {api_key}")
+    print("="*60)
+    print("\n💡 此 API Key 可用于 Cursor CLI 和 API 调用")
+
+    # 写入到 ~/.zshrc
+    if update_env:
+        print("\n🔟 写入环境变量...")
+        update_zshrc_with_api_key(api_key)
+
+    return api_key
+
+
 def get_manual_login_script(info: Dict[str, str]) -> str:
     """
     获取手动登录的 JavaScript 代码
@@ -5,24 +5,117 @@
 
 import os
 
-# Cursor 数据库路径
-DB_PATH = os.path.expanduser("~/Library/Application Support/Cursor/User/globalStorage/state.vscdb")
+# 以下标注「可由环境变量覆盖」的配置项，可通过 CURSOR_LOGIN_<名称> 环境变量
+# 在导入本包之前修改（例如基准测试把网站地址指向本地模拟服务器）
+_ENV_PREFIX = "CURSOR_LOGIN_"
 
-# Cursor 网站相关
-CURSOR_WEBSITE = "https://cursor.com/"
-CURSOR_DASHBOARD = "https://www.cursor.com/dashboard"
-CURSOR_INTEGRATIONS = "https://www.cursor.com/dashboard?tab=integrations"
 
-# Cookie 配置
+def _env(name: str, default: str) -> str:
+    return os.environ.get(_ENV_PREFIX + name, default)
+
+
+# Cursor 数据库路径（可由环境变量覆盖）
+DB_PATH = os.path.expanduser(_env("DB_PATH", "~/Library/Application Support/Cursor/User/globalStorage/state.vscdb"))
+DB_IMMUTABLE = False  # 是否以 immutable=1 快照模式只读打开
+DB_BUSY_TIMEOUT = 2.0  # 数据库被锁定时单次等待时间（秒）
+DB_RETRY_ATTEMPTS = 3  # 数据库被锁定时的最大尝试次数
+DB_RETRY_DELAY = 0.2  # 重试的初始退避时间（秒），每次翻倍
+
+# Token 预检：距离过期不足该秒数的 Token 视为已过期（容忍本机时钟偏差、避免登录途中过期）
+TOKEN_EXPIRY_SKEW = 60
+
+# 本地缓存目录（仅当前用户可访问，可由环境变量覆盖）
+CACHE_DIR = os.path.expanduser(_env("CACHE_DIR", "~/.cache/cursor_login"))
+TOKEN_CACHE_ENABLED = True  # 数据库未变化时复用已解析的账户信息
+TOKEN_CACHE_PATH = os.path.join(CACHE_DIR, "token_cache.json")
+SELECTOR_CACHE_ENABLED = True  # 记住上次命中的按钮文本，下次优先尝试
+SELECTOR_CACHE_PATH = os.path.join(CACHE_DIR, "selectors.json")
+# 本工具创建的 API Key 记录（含账户和创建时间）
+CREDENTIAL_STORE_PATH = os.path.join(CACHE_DIR, "credentials.json")
+CREDENTIAL_HISTORY = 5  # 每个账户保留的 API Key 记录数
+# 每个账户独立、跨运行保留的 Chrome 用户数据目录（--user-data-dir）
+PERSISTENT_PROFILE = False
+PROFILE_DIR = os.path.join(CACHE_DIR, "profiles")
+# 登录成功后保存会话快照（Cookie 与本地存储），Refresh Token 未变化时下次直接恢复
+SESSION_SNAPSHOT = True
+SESSION_SNAPSHOT_DIR = os.path.join(CACHE_DIR, "sessions")
+# Selenium Manager 查找到的 chromedriver / Chrome 路径
+DRIVER_PATHS_CACHE_PATH = os.path.join(CACHE_DIR, "driver_paths.json")
+# 写入 rc 文件时持有的文件锁（放在缓存目录，不在用户主目录留下文件）
+RC_LOCK_PATH = os.path.join(CACHE_DIR, "zshrc.lock")
+# --profile 输出文件前缀（生成 <前缀>.pstats 和 <前缀>.folded）
+PROFILER_OUTPUT_PREFIX = "cursor_login_profile"
+# 统计每个步骤发出的 WebDriver 命令数与耗时（--roundtrips 启用）
+ROUNDTRIP_ACCOUNTING = False
+
+# Cursor 网站相关（可由环境变量覆盖）
+CURSOR_WEBSITE = _env("WEBSITE", "https://cursor.com/")
+CURSOR_DASHBOARD = _env("DASHBOARD", "https://www.cursor.com/dashboard")
+CURSOR_INTEGRATIONS = _env("INTEGRATIONS", "https://www.cursor.com/dashboard?tab=integrations")
+# Dashboard 前端创建 User API Key 时调用的接口（HTTP 后端使用）
+CURSOR_API_KEY_CREATE_URL = _env("API_KEY_CREATE_URL", "https://www.cursor.com/api/dashboard/create-user-api-key")
+# 校验 API Key 是否仍然有效的接口（Bearer 认证，401/403 视为失效）
+API_KEY_VALIDATE_URL = _env("API_KEY_VALIDATE_URL", "https://api.cursor.com/v0/me")
+
+# Cookie 配置（域名可由环境变量覆盖）
 COOKIE_NAME = "WorkosCursorSessionToken"
-COOKIE_DOMAIN = ".cursor.com"
+COOKIE_DOMAIN = _env("COOKIE_DOMAIN", ".cursor.com")
 COOKIE_PATH = "/"
+COOKIE_MAX_AGE = 5184000  # Cookie 有效期（秒），60 天
+
+# 认证页面域名（Cookie 失效时会被重定向到这里，可由环境变量覆盖）
+AUTHENTICATOR_HOST = _env("AUTHENTICATOR_HOST", "authenticator.cursor.sh")
+
+# 登录后端："selenium" 始终使用浏览器；"http" 先走纯 HTTP 快速通道，失败时回退到浏览器
+LOGIN_BACKEND = "selenium"
+HTTP_USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
 
 # 浏览器配置
 DEFAULT_WINDOW_SIZE = "1920,1080"
 DEFAULT_TIMEOUT = 15  # 默认超时时间（秒）
+POLL_FREQUENCY = 0.1  # 条件等待的轮询间隔（秒）
+
+# 浏览器配置档："default" 加载完整页面；"lean" 屏蔽图片、字体和第三方脚本，
+# 关闭扩展与后台网络，并使用 eager 页面加载策略（仅无头模式生效）
+BROWSER_PROFILE = "default"
+LEAN_BLOCKED_URLS = [
+    # 图片
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.ico", "*.svg",
+    # 字体
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*fonts.googleapis.com*", "*fonts.gstatic.com*",
+    # 统计与追踪脚本
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*segment.com*", "*segment.io*", "*intercom.io*", "*intercomcdn.com*",
+    "*hotjar.com*", "*sentry.io*", "*posthog.com*", "*datadoghq*",
+]
+
+# 批量模式和守护模式下所有浏览器共用一个 chromedriver 进程
+SHARE_CHROMEDRIVER = True
+
+# 会话池配置
+POOL_SIZE = 2  # 预启动的无头浏览器数量
+POOL_MAX_IDLE = 300  # 浏览器最大空闲时间（秒），超过后淘汰
 
 # API Key 配置
 API_KEY_PREFIX = "auto_key_"
-ZSHRC_PATH = os.path.expanduser("~/.zshrc")
+API_KEY_PATTERN = r"key_[a-zA-Z0-9]{32,}"
+# API Key 提取方式："dom" 从渲染后的页面读取；"network" 通过 Chrome 性能日志
+# 直接读取创建请求的 JSON 响应（失败时回退到 "dom"）
+API_KEY_EXTRACTION = "dom"
+# 已记录的 API Key 仍然有效时直接复用，跳过 Integrations 页面
+API_KEY_REUSE = True
+ZSHRC_PATH = os.path.expanduser(_env("ZSHRC_PATH", "~/.zshrc"))
 ENV_VAR_NAME = "CURSOR_API_KEY"
+
+# 批量模式配置
+BATCH_PARALLELISM = 4  # 默认并发登录数
+BATCH_RESULTS_PATH = "batch_results.jsonl"  # 每个账户一行的结果文件
+
+# 守护模式配置
+DAEMON_REFRESH_MARGIN = 3600  # 在 Token 过期前多少秒重新登录并刷新 API Key
+DAEMON_JITTER = 300  # 随机提前的最大秒数，避免多个账户同时登录
+DAEMON_CONCURRENCY = 2  # 同时进行的登录数上限
+DAEMON_RETRY_DELAY = 600  # 登录失败或 Token 未续期时的重试间隔（秒）
@@ -0,0 +1,276 @@
+"""
+浏览器上下文模块
+在同一个无头 Chrome 中为每个账户创建隔离的浏览器上下文（独立的 Cookie 和存储），
+代替每个账户各启动一个 Chrome
+"""
+
+import http.client
+import itertools
+import json
+import socket
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .config import BROWSER_PROFILE, DEFAULT_TIMEOUT, POOL_SIZE
+
+
+class ContextPool:
+    """
+    单个 Chrome 进程中的隔离上下文池，接口与 DriverPool 相同
+
+    - 首次 acquire()（或 warm()）时才启动共享的 chromedriver 和一个带远程调试端口的
+      无头 Chrome（宿主会话）；不需要浏览器的账户不承担冷启动
+    - acquire() 经浏览器级 DevTools WebSocket 发送 Target.createBrowserContext
+      新建上下文并在其中打开页面（页面级会话无权执行这些 Target 命令），
+      再经 debuggerAddress 附加一个独立的 WebDriver 会话并切换到该页面；
+      各会话互不干扰，可以并发执行登录流程
+    - release() 断开会话并用 Target.disposeBrowserContext 销毁上下文，
+      Cookie、存储和页面随之释放
+    """
+
+    def __init__(self, size: int = POOL_SIZE, capture_network: bool = False,
+                 profile: str = BROWSER_PROFILE):
+        """
+        Args:
+            size: 同时存在的上下文数量上限
+            capture_network: 附加的会话是否启用性能日志
+            profile: 浏览器配置档，"default" 或 "lean"
+        """
+        self.size = size
+        self.capture_network = capture_network
+        self.profile = profile
+        self.lean = profile == "lean"
+        self.port = None
+        self._slots = threading.BoundedSemaphore(size)
+        self._contexts = {}  # id(driver) -> browserContextId
+        self._closed = False
+        self._start_lock = threading.Lock()
+        self._chromedriver = None
+        self._host = None
+        self._browser = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def warm(self, count=None):
+        """预先启动宿主 Chrome；上下文按需创建，count 仅为与 DriverPool 接口保持一致"""
+        self._ensure_host()
+
+    def evict_idle(self) -> int:
+        """与 DriverPool 接口保持一致；上下文在归还时即被销毁，没有空闲实例"""
+        return 0
+
+    def acquire(self, timeout: float = DEFAULT_TIMEOUT):
+        """
+        新建一个隔离上下文并返回控制它的 WebDriver 会话
+
+        Args:
+            timeout: 上下文数量已达上限时等待的超时时间（秒）
+
+        Returns:
+            Selenium WebDriver 实例
+        """
+        if self._closed:
+            raise RuntimeError("上下文池已关闭")
+        self._ensure_host()
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("等待浏览器上下文超时")
+
+        context_id = None
+        try:
+            context_id = self._browser.send(
+                "Target.createBrowserContext", {'disposeOnDetach': False}
+            )['browserContextId']
+            target_id = self._browser.send("Target.createTarget", {
+                'url': 'about:blank',
+                'browserContextId': context_id
+            })['targetId']
+
+            driver = self._attach(target_id)
+        except Exception:
+            if context_id is not None:
+                self._dispose_context(context_id)
+            self._slots.release()
+            raise
+
+        self._contexts[id(driver)] = context_id
+        return driver
+
+    def release(self, driver, discard: bool = False):
+        """
+        断开会话并销毁其上下文
+
+        Args:
+            driver: acquire() 返回的 WebDriver 实例
+            discard: 与 DriverPool 接口保持一致；上下文总是被销毁
+        """
+        context_id = self._contexts.pop(id(driver), None)
+        try:
+            # 附加到已有浏览器的会话 quit() 只断开连接，不会关闭共享的 Chrome
+            driver.quit()
+        except Exception:
+            pass
+        if context_id is not None:
+            self._dispose_context(context_id)
+        self._slots.release()
+
+    def close(self):
+        """关闭共享的 Chrome 和 chromedriver（未启动时不做任何事）"""
+        with self._start_lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._host is None:
+                return
+            self._browser.close()
+            try:
+                self._host.quit()
+            except Exception:
+                pass
+            self._chromedriver.__exit__(None, None, None)
+
+    def _ensure_host(self):
+        """启动宿主 Chrome 并连接其浏览器级 DevTools（只执行一次）"""
+        from .browser import _create_driver
+        from .driver_service import shared_chromedriver
+
+        with self._start_lock:
+            if self._closed:
+                raise RuntimeError("上下文池已关闭")
+            if self._host is not None:
+                return
+
+            # 所有附加会话共用一个 chromedriver，而不是每个上下文各启动一个
+            chromedriver = shared_chromedriver()
+            chromedriver.__enter__()
+
+            port = _free_port()
+            host = None
+            try:
+                host = _create_driver(headless=True, profile=self.profile,
+                                      extra_args=[f'--remote-debugging-port={port}'])
+                browser = BrowserConnection(port)
+            except Exception:
+                if host is not None:
+                    host.quit()
+                chromedriver.__exit__(None, None, None)
+                raise
+
+            self._chromedriver, self._host, self._browser, self.port = chromedriver, host, browser, port
+        print(f"🧭 共享 Chrome 已启动（调试端口 {port}），每个账户使用独立的浏览器上下文")
+
+    def _attach(self, target_id: str):
+        """经 debuggerAddress 附加新会话，并切换到上下文中的页面"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from .browser import _block_heavy_resources
+        from .driver_service import create_service, remote_chrome, shared_service
+        from .roundtrips import maybe_instrument
+
+        options = Options()
+        options.debugger_address = f"127.0.0.1:{self.port}"
+        if self.capture_network:
+            options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+        service = shared_service()
+        if service is not None:
+            driver = remote_chrome(service, options)
+        else:
+            driver = webdriver.Chrome(service=create_service(), options=options)
+        maybe_instrument(driver)
+
+        # chromedriver 的窗口句柄即 DevTools target ID；新页面可能稍后才出现在列表中
+        deadline = time.monotonic() + DEFAULT_TIMEOUT
+        while target_id not in driver.window_handles:
+            if time.monotonic() > deadline:
+                driver.quit()
+                raise RuntimeError(f"附加的会话中找不到页面 {target_id}")
+            time.sleep(0.05)
+        driver.switch_to.window(target_id)
+
+        if self.lean:
+            _block_heavy_resources(driver)
+        return driver
+
+    def _dispose_context(self, context_id: str):
+        try:
+            self._browser.send("Target.disposeBrowserContext", {'browserContextId': context_id})
+        except Exception as e:
+            print(f"   ⚠️  销毁浏览器上下文失败: {e}")
+
+
+class BrowserConnection:
+    """
+    浏览器级 DevTools 连接
+
+    Target.createBrowserContext 等命令只能在浏览器级会话上执行，chromedriver 的
+    execute_cdp_cmd 属于页面会话，Chrome 会以 "Not allowed" 拒绝；因此直接连接
+    /json/version 返回的 webSocketDebuggerUrl。同一时间只有一个命令在途。
+    """
+
+    def __init__(self, port: int, timeout: float = DEFAULT_TIMEOUT):
+        """
+        Args:
+            port: Chrome 的远程调试端口
+            timeout: 连接和等待响应的超时时间（秒）
+        """
+        import websocket  # Selenium 4 的依赖 websocket-client
+
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._ws = websocket.create_connection(_browser_websocket_url(port, timeout),
+                                               timeout=timeout, suppress_origin=True)
+
+    def send(self, method: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        发送一条 CDP 命令并等待其响应
+
+        Args:
+            method: 命令名，如 "Target.createBrowserContext"
+            params: 命令参数
+
+        Returns:
+            响应中的 result 字典
+
+        Raises:
+            RuntimeError: Chrome 返回错误
+        """
+        with self._lock:
+            message_id = next(self._ids)
+            self._ws.send(json.dumps({'id': message_id, 'method': method, 'params': params or {}}))
+            while True:
+                # 跳过事件和其他消息，直到收到本命令的响应
+                message = json.loads(self._ws.recv())
+                if message.get('id') == message_id:
+                    break
+
+        if 'error' in message:
+            raise RuntimeError(f"{method} 失败: {message['error'].get('message')}")
+        return message.get('result', {})
+
+    def close(self):
+        try:
+            self._ws.close()
+        except Exception:
+            pass
+
+
+def _browser_websocket_url(port: int, timeout: float) -> str:
+    """从 /json/version 读取浏览器级 webSocketDebuggerUrl"""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+    try:
+        conn.request('GET', '/json/version')
+        return json.loads(conn.getresponse().read())['webSocketDebuggerUrl']
+    finally:
+        conn.close()
+
+
+def _free_port() -> int:
+    """向系统申请一个空闲的本地端口"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
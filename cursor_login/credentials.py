@@ -0,0 +1,104 @@
+"""
+凭据存储模块
+记录本工具创建的 API Key，并在仍然有效时复用
+"""
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from .config import CREDENTIAL_STORE_PATH, CREDENTIAL_HISTORY, ENV_VAR_NAME
+from .storage import read_private_json, write_private_json
+from .timing import timed
+
+_store_lock = threading.Lock()
+
+
+def record_api_key(info: Dict[str, str], api_key: str):
+    """
+    记录新创建的 API Key
+
+    Args:
+        info: 用户信息字典
+        api_key: API Key 字符串
+    """
+    with _store_lock:
+        store = _load_store()
+        entries = [e for e in store.get(info['user_id'], []) if e.get('api_key') != api_key]
+        entries.insert(0, {
+            'api_key': api_key,
+            'email': info.get('email'),
+            'created_at': int(time.time())
+        })
+        store[info['user_id']] = entries[:CREDENTIAL_HISTORY]
+        write_private_json(CREDENTIAL_STORE_PATH, store)
+
+
+def recorded_api_keys(info: Dict[str, str]) -> List[Dict]:
+    """
+    返回账户已记录的 API Key，新的在前
+
+    Args:
+        info: 用户信息字典
+
+    Returns:
+        记录列表，每项包含 api_key, email, created_at
+    """
+    return list(_load_store().get(info['user_id'], []))
+
+
+@timed("reuse_api_key")
+def find_reusable_api_key(info: Dict[str, str]) -> Optional[str]:
+    """
+    查找该账户仍然有效的 API Key
+
+    优先检查当前环境变量中的 Key（须为本工具为该账户创建的），其次按创建时间
+    从新到旧检查。被服务端拒绝的 Key 会从记录中删除；无法判断时停止检查，
+    交由调用方创建新 Key。
+
+    Args:
+        info: 用户信息字典
+
+    Returns:
+        有效的 API Key，没有则返回 None
+    """
+    from .http_backend import validate_api_key_http
+
+    keys = [e['api_key'] for e in recorded_api_keys(info) if e.get('api_key')]
+    if not keys:
+        return None
+
+    current = os.environ.get(ENV_VAR_NAME)
+    if current in keys:
+        keys.remove(current)
+        keys.insert(0, current)
+
+    print("\n🔎 检查已有 API Key 是否仍然有效...")
+    for api_key in keys:
+        valid = validate_api_key_http(api_key)
+        if valid:
+            print("   ✅ 已有 API Key 仍然有效，跳过创建")
+            return api_key
+        if valid is None:
+            return None
+        print(f"   → API Key {api_key[:12]}... 已失效")
+        _forget_api_key(info, api_key)
+
+    return None
+
+
+def _forget_api_key(info: Dict[str, str], api_key: str):
+    """从记录中删除失效的 API Key"""
+    with _store_lock:
+        store = _load_store()
+        entries = store.get(info['user_id'], [])
+        remaining = [e for e in entries if e.get('api_key') != api_key]
+        if len(remaining) != len(entries):
+            store[info['user_id']] = remaining
+            write_private_json(CREDENTIAL_STORE_PATH, store)
+
+
+def _load_store() -> Dict[str, List[Dict]]:
+    store = read_private_json(CREDENTIAL_STORE_PATH)
+    return store if isinstance(store, dict) else {}
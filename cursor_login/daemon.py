@@ -0,0 +1,257 @@
+"""
+守护模式模块
+根据 Refresh Token 的 exp 在过期前重新登录并刷新 API Key
+"""
+
+import heapq
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from .config import (
+    DB_PATH,
+    DAEMON_REFRESH_MARGIN,
+    DAEMON_JITTER,
+    DAEMON_CONCURRENCY,
+    DAEMON_RETRY_DELAY,
+    LOGIN_BACKEND,
+    API_KEY_EXTRACTION,
+    API_KEY_REUSE,
+    BROWSER_PROFILE,
+    PERSISTENT_PROFILE,
+    SESSION_SNAPSHOT,
+    SHARE_CHROMEDRIVER
+)
+from .database import token_expires_at
+from .timing import span
+
+
+class RefreshScheduler:
+    """
+    基于最小堆的刷新调度器
+
+    每个账户在 exp - margin - jitter 时刻到期；调度线程只等待堆顶的到期时间，
+    到期任务交给有界线程池执行，完成后根据新 Token 的 exp 重新入堆。
+    登录不会续期 Refresh Token：已为某个 exp 刷新过的账户只定期重新读取 Token，
+    直到客户端续期（exp 变化）后才再次登录。
+
+    Args:
+        accounts: 账户行列表（格式同 batch.load_accounts）
+        margin: 过期前多少秒刷新
+        jitter: 随机提前的最大秒数
+        concurrency: 同时进行的登录数上限
+        retry_delay: 登录失败或 Token 未续期时的重试间隔（秒）
+        update_env: 是否将 API Key 写入 ~/.zshrc（仅单账户时有意义）
+        login_options: 传给 browser.login_account 的其余参数
+    """
+
+    def __init__(self, accounts: List[Dict[str, str]], margin: float = DAEMON_REFRESH_MARGIN,
+                 jitter: float = DAEMON_JITTER, concurrency: int = DAEMON_CONCURRENCY,
+                 retry_delay: float = DAEMON_RETRY_DELAY, update_env: bool = False,
+                 **login_options):
+        self.accounts = accounts
+        self.margin = margin
+        self.jitter = jitter
+        self.concurrency = max(1, concurrency)
+        self.retry_delay = retry_delay
+        self.update_env = update_env
+        self.login_options = login_options
+
+        self._heap = []
+        self._seq = 0
+        self._refreshed_exp: Dict[int, int] = {}  # 账户序号 -> 已刷新过的 Token 的 exp
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._slots = threading.BoundedSemaphore(self.concurrency)
+
+    def schedule(self, index: int, due: float, quiet: bool = False):
+        """
+        将账户加入定时队列
+
+        Args:
+            index: 账户序号
+            due: 到期时间（Unix 时间戳）
+            quiet: 不打印下次刷新时间（仅重新读取 Token 时）
+        """
+        with self._cond:
+            heapq.heappush(self._heap, (due, self._seq, index))
+            self._seq += 1
+            self._cond.notify()
+
+        if not quiet:
+            account = self.accounts[index]
+            print(f"🗓️  [{account.get('email') or index}] 下次刷新: {_format_time(due)}")
+
+    def next_due(self, info: Optional[Dict[str, str]]) -> float:
+        """
+        根据 Token 的 exp 计算下次刷新时间
+
+        无法解析 exp 时按重试间隔处理；已进入刷新窗口时立即执行。
+
+        Args:
+            info: 用户信息字典
+
+        Returns:
+            到期时间（Unix 时间戳）
+        """
+        now = time.time()
+        exp = token_expires_at(info['token']) if info else None
+        if exp is None:
+            return now + self.retry_delay
+        return max(now, exp - self.margin - random.uniform(0, self.jitter))
+
+    def stop(self):
+        """停止调度（正在执行的登录会继续完成）"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def run(self):
+        """运行调度循环，直到 stop() 被调用"""
+        from .batch import resolve_account
+
+        print(f"\n🛰️  守护模式：{len(self.accounts)} 个账户，"
+              f"过期前 {self.margin:.0f} 秒刷新，并发上限 {self.concurrency}")
+
+        for index, account in enumerate(self.accounts):
+            self.schedule(index, self.next_due(resolve_account(account)))
+
+        with ThreadPoolExecutor(max_workers=self.concurrency,
+                                thread_name_prefix="refresh") as executor:
+            while True:
+                index = self._wait_for_due()
+                if index is None:
+                    break
+                # 并发已满时在此阻塞，到期任务留在调度线程而不是堆积在线程池队列
+                self._slots.acquire()
+                executor.submit(self._refresh, index)
+
+    def _wait_for_due(self) -> Optional[int]:
+        """等待堆顶任务到期并弹出，停止时返回 None"""
+        with self._cond:
+            while not self._stopped:
+                if self._heap:
+                    due, _, index = self._heap[0]
+                    delay = due - time.time()
+                    if delay <= 0:
+                        heapq.heappop(self._heap)
+                        return index
+                    self._cond.wait(timeout=delay)
+                else:
+                    self._cond.wait()
+            return None
+
+    def _refresh(self, index: int):
+        """重新登录一个账户（Token 未续期时只重新读取），并重新入堆"""
+        from .batch import resolve_account
+
+        account = self.accounts[index]
+        label = account.get('email') or index
+        quiet = False
+        try:
+            info = resolve_account(account)
+            exp = token_expires_at(info['token']) if info else None
+            if exp is not None and self._refreshed_exp.get(index) == exp:
+                # 已为这个 Token 登录过，再次登录只会重复创建 API Key；等待客户端续期
+                quiet = True
+                due = time.time() + self.retry_delay
+            else:
+                due, quiet = self._login(index, label, info, exp)
+        except Exception as e:
+            print(f"   ❌ [{label}] 刷新出错: {e}")
+            due = time.time() + self.retry_delay
+        finally:
+            self._slots.release()
+
+        if not self._stopped:
+            self.schedule(index, due, quiet=quiet)
+
+    def _login(self, index: int, label, info: Optional[Dict[str, str]],
+               exp: Optional[int]) -> Tuple[float, bool]:
+        """执行一次登录，返回 (下次调度时间, 是否只是重新读取 Token)"""
+        from .batch import resolve_account
+        from .browser import login_account
+
+        with span("refresh", index=index, email=self.accounts[index].get('email')) as s:
+            print(f"\n🔄 [{label}] 开始刷新 ({_format_time(time.time())})")
+            result = login_account(info, update_env=self.update_env,
+                                   **self.login_options) if info else None
+            if not result or not result['success']:
+                s.fail()
+                print(f"   ❌ [{label}] 刷新失败，{self.retry_delay:.0f} 秒后重试")
+                return time.time() + self.retry_delay, False
+
+            print(f"   ✅ [{label}] 刷新完成")
+            if exp is not None:
+                self._refreshed_exp[index] = exp
+
+            # 客户端可能在登录过程中续期了 Token，重新读取
+            due = self.next_due(resolve_account(self.accounts[index]))
+            if due <= time.time():
+                print(f"   ⚠️  [{label}] Token 尚未续期，每 {self.retry_delay:.0f} 秒重新读取一次，"
+                      f"续期后再登录")
+                return time.time() + self.retry_delay, True
+            return due, False
+
+
+def run_daemon(accounts_path: Optional[str] = None, margin: float = DAEMON_REFRESH_MARGIN,
+               jitter: float = DAEMON_JITTER, concurrency: int = DAEMON_CONCURRENCY,
+               headless: bool = True, backend: str = LOGIN_BACKEND,
+               extraction: str = API_KEY_EXTRACTION,
+               profile: str = BROWSER_PROFILE,
+               persistent_profile: bool = PERSISTENT_PROFILE,
+               session_snapshot: bool = SESSION_SNAPSHOT,
+               reuse_key: bool = API_KEY_REUSE):
+    """
+    以守护模式运行，直到收到 Ctrl+C / SIGTERM
+
+    Args:
+        accounts_path: 账户文件路径；为空时刷新本机 Cursor 数据库中的账户，
+                       并将 API Key 写入 ~/.zshrc
+        margin: 过期前多少秒刷新
+        jitter: 随机提前的最大秒数
+        concurrency: 同时进行的登录数上限
+        headless: 是否使用无头模式
+        backend: 登录后端，"selenium" 或 "http"
+        extraction: API Key 提取方式，"dom" 或 "network"
+        profile: 浏览器配置档，"default" 或 "lean"
+        persistent_profile: 每个账户使用独立的持久化 Chrome 用户数据目录
+        session_snapshot: 恢复并保存每个账户的会话快照
+        reuse_key: 已记录的 API Key 仍然有效时复用，不创建新 Key
+    """
+    import signal
+
+    if accounts_path:
+        from .batch import load_accounts
+        accounts = load_accounts(accounts_path)
+    else:
+        accounts = [{'db_path': DB_PATH}]
+
+    scheduler = RefreshScheduler(
+        accounts, margin=margin, jitter=jitter, concurrency=concurrency,
+        update_env=not accounts_path, headless=headless, backend=backend,
+        extraction=extraction, profile=profile, reuse_key=reuse_key,
+        persistent_profile=persistent_profile, session_snapshot=session_snapshot
+    )
+
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, lambda *_: scheduler.stop())
+
+    from contextlib import nullcontext
+    from .driver_service import shared_chromedriver
+
+    # 守护进程长期运行，所有刷新共用一个 chromedriver
+    chromedriver = shared_chromedriver() if SHARE_CHROMEDRIVER and backend != "http" else nullcontext()
+    with chromedriver:
+        try:
+            scheduler.run()
+        except KeyboardInterrupt:
+            scheduler.stop()
+            raise
+
+
+def _format_time(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
@@ -6,16 +6,54 @@
 import sqlite3
 import json
 import base64
+import os
+import re
+import threading
+import time
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Optional, Dict, List
+from urllib.parse import quote
 
-from .config import DB_PATH
+from .config import (
+    DB_PATH,
+    DB_IMMUTABLE,
+    DB_BUSY_TIMEOUT,
+    DB_RETRY_ATTEMPTS,
+    DB_RETRY_DELAY,
+    TOKEN_CACHE_ENABLED,
+    TOKEN_CACHE_PATH,
+    TOKEN_EXPIRY_SKEW
+)
+from .storage import read_private_json, write_private_json
+from .timing import timed, note_retry
 
+# ItemTable 中存储账户信息的键
+EMAIL_KEY = 'cursorAuth/cachedEmail'
+TOKEN_KEY = 'cursorAuth/refreshToken'
 
-def get_cursor_token() -> Optional[Dict[str, str]]:
+# JWT sub 的格式：可选的身份提供方前缀（如 auth0|）加 Cursor User ID
+_SUB_PATTERN = re.compile(r'^(?:[\w-]+\|)?user_[A-Za-z0-9]+$')
+
+# 同一进程内并发（批量模式）写缓存时串行化
+_cache_lock = threading.Lock()
+
+
+@timed("get_cursor_token")
+def get_cursor_token(db_path: Optional[str] = None,
+                     immutable: bool = DB_IMMUTABLE,
+                     use_cache: bool = TOKEN_CACHE_ENABLED) -> Optional[Dict[str, str]]:
     """
     从 Cursor 数据库获取 Token 和用户信息
 
+    数据库以只读方式打开，不会与正在运行的 Cursor 客户端争抢写锁。
+
+    Args:
+        db_path: 数据库路径，默认使用 config.DB_PATH
+        immutable: 是否以 immutable=1 快照模式打开（完全不加锁，
+                   但可能读不到尚未合并的 WAL 写入）
+        use_cache: 是否使用本地缓存；数据库文件未变化时直接返回缓存结果，
+                   跳过 SQLite 查询和 JWT 解码
+
     Returns:
         包含用户信息的字典，格式：
         {
@@ -26,46 +64,166 @@ def get_cursor_token() -> Optional[Dict[str, str]]:
         }
         如果失败返回 None
     """
-    try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-
-        # 获取邮箱
-        cursor.execute("SELECT value FROM ItemTable WHERE key = 'cursorAuth/cachedEmail'")
-        email_result = cursor.fetchone()
-        email = email_result[0] if email_result else None
+    db_path = os.path.abspath(db_path or DB_PATH)
+    fingerprint = _db_fingerprint(db_path) if use_cache else None
 
-        # 获取 Token
-        cursor.execute("SELECT value FROM ItemTable WHERE key = 'cursorAuth/refreshToken'")
-        token_result = cursor.fetchone()
-        token = token_result[0] if token_result else None
+    if fingerprint:
+        cached = _load_cached_info(db_path, fingerprint)
+        if cached:
+            return cached
 
-        conn.close()
+    try:
+        items = _read_auth_items(db_path, immutable)
+        email = items.get(EMAIL_KEY)
+        token = items.get(TOKEN_KEY)
 
         if not email or not token:
             print("❌ 无法获取 Cursor 账户信息")
             return None
 
-        # 从 Token 中解析 User ID
-        try:
-            user_id, expiry = _parse_jwt_token(token)
-        except Exception as e:
-            print(f"⚠️  Token 解析失败: {e}")
-            user_id = "unknown"
-            expiry = "未知"
-
-        return {
-            'email': email,
-            'token': token,
-            'user_id': user_id,
-            'expiry': expiry
-        }
+        info = build_account_info(email, token)
+        if fingerprint and info['user_id'] != "unknown":
+            _store_cached_info(db_path, fingerprint, info)
+        return info
 
     except Exception as e:
         print(f"❌ 读取数据库失败: {e}")
         return None
 
 
+def _read_auth_items(db_path: str, immutable: bool) -> Dict[str, str]:
+    """
+    以只读方式一次查询读取邮箱和 Token
+
+    数据库被锁定时按指数退避重试，重试耗尽后抛出异常。
+
+    Args:
+        db_path: 数据库路径
+        immutable: 是否使用 immutable=1 快照模式
+
+    Returns:
+        {key: value} 字典
+    """
+    uri = f"file:{quote(db_path)}?mode=ro"
+    if immutable:
+        uri += "&immutable=1"
+
+    for attempt in range(DB_RETRY_ATTEMPTS):
+        try:
+            conn = sqlite3.connect(uri, uri=True, timeout=DB_BUSY_TIMEOUT)
+            try:
+                rows = conn.execute(
+                    "SELECT key, value FROM ItemTable WHERE key IN (?, ?)",
+                    (EMAIL_KEY, TOKEN_KEY)
+                ).fetchall()
+            finally:
+                conn.close()
+            return dict(rows)
+        except sqlite3.OperationalError as e:
+            message = str(e).lower()
+            if 'locked' not in message and 'busy' not in message:
+                raise
+            if attempt == DB_RETRY_ATTEMPTS - 1:
+                raise
+            delay = DB_RETRY_DELAY * (2 ** attempt)
+            print(f"⚠️  数据库被锁定，{delay:.1f} 秒后重试...")
+            note_retry()
+            time.sleep(delay)
+
+    return {}
+
+
+def _db_fingerprint(db_path: str) -> Optional[List[int]]:
+    """
+    计算数据库文件的指纹 (inode, mtime, size)
+
+    WAL 模式下写入先落在 -wal 文件中，因此一并计入其指纹。
+
+    Args:
+        db_path: 数据库路径
+
+    Returns:
+        指纹列表，文件不存在返回 None
+    """
+    try:
+        st = os.stat(db_path)
+    except OSError:
+        return None
+
+    fingerprint = [st.st_ino, st.st_mtime_ns, st.st_size]
+    try:
+        wal = os.stat(db_path + '-wal')
+        fingerprint += [wal.st_ino, wal.st_mtime_ns, wal.st_size]
+    except OSError:
+        pass
+    return fingerprint
+
+
+def _load_cached_info(db_path: str, fingerprint: List[int]) -> Optional[Dict[str, str]]:
+    """
+    读取指纹匹配的缓存记录
+
+    Args:
+        db_path: 数据库绝对路径
+        fingerprint: 当前数据库指纹
+
+    Returns:
+        缓存的用户信息，未命中返回 None
+    """
+    cache = read_private_json(TOKEN_CACHE_PATH)
+    if not isinstance(cache, dict):
+        return None
+
+    entry = cache.get(db_path)
+    if not isinstance(entry, dict) or entry.get('fingerprint') != fingerprint:
+        return None
+    return entry.get('info')
+
+
+def _store_cached_info(db_path: str, fingerprint: List[int], info: Dict[str, str]):
+    """
+    写入缓存记录（文件权限 0600）
+
+    Args:
+        db_path: 数据库绝对路径
+        fingerprint: 当前数据库指纹
+        info: 用户信息字典
+    """
+    with _cache_lock:
+        cache = read_private_json(TOKEN_CACHE_PATH)
+        if not isinstance(cache, dict):
+            cache = {}
+        cache[db_path] = {'fingerprint': fingerprint, 'info': info}
+        write_private_json(TOKEN_CACHE_PATH, cache)
+
+
+def build_account_info(email: str, token: str) -> Dict[str, str]:
+    """
+    根据邮箱和 Refresh Token 构造用户信息字典
+
+    Args:
+        email: 用户邮箱
+        token: Refresh Token（JWT）
+
+    Returns:
+        与 get_cursor_token 返回格式相同的字典
+    """
+    # 从 Token 中解析 User ID
+    try:
+        user_id, expiry = _parse_jwt_token(token)
+    except Exception as e:
+        print(f"⚠️  Token 解析失败: {e}")
+        user_id = "unknown"
+        expiry = "未知"
+
+    return {
+        'email': email,
+        'token': token,
+        'user_id': user_id,
+        'expiry': expiry
+    }
+
+
 def _parse_jwt_token(token: str) -> tuple[str, str]:
     """
     解析 JWT Token，提取 User ID 和过期时间
@@ -76,6 +234,81 @@ def _parse_jwt_token(token: str) -> tuple[str, str]:
     Returns:
         (user_id, expiry) 元组
     """
+    payload_data = _decode_jwt_payload(token)
+
+    # 提取 User ID（移除 auth0| 前缀）
+    user_id = payload_data['sub'].replace('auth0|', '')
+
+    # 获取过期时间
+    exp_time = datetime.fromtimestamp(payload_data['exp'])
+    expiry = exp_time.strftime('%Y-%m-%d %H:%M:%S')
+
+    return user_id, expiry
+
+
+def validate_token(token: str, skew: float = TOKEN_EXPIRY_SKEW) -> Optional[str]:
+    """
+    预检 Refresh Token，在启动浏览器之前发现注定失败的登录
+
+    检查 JWT 结构、exp 是否已过期（含时钟偏差余量）以及 sub 格式。
+
+    Args:
+        token: JWT Token 字符串
+        skew: 距离过期不足该秒数时视为已过期
+
+    Returns:
+        Token 可用返回 None，否则返回原因说明
+    """
+    if not token or token.count('.') != 2:
+        return "不是 header.payload.signature 格式的 JWT"
+
+    try:
+        payload = _decode_jwt_payload(token)
+    except Exception:
+        return "payload 无法解码"
+    if not isinstance(payload, dict):
+        return "payload 不是 JSON 对象"
+
+    exp = payload.get('exp')
+    if not isinstance(exp, (int, float)) or isinstance(exp, bool):
+        return "缺少 exp"
+    if exp - skew <= time.time():
+        expired_at = datetime.fromtimestamp(exp).strftime('%Y-%m-%d %H:%M:%S')
+        return f"已于 {expired_at} 过期"
+
+    sub = payload.get('sub')
+    if not isinstance(sub, str) or not _SUB_PATTERN.match(sub):
+        return f"sub 格式不正确: {sub!r}"
+
+    return None
+
+
+def token_expires_at(token: str) -> Optional[int]:
+    """
+    读取 JWT Token 的 exp（Unix 时间戳）
+
+    Args:
+        token: JWT Token 字符串
+
+    Returns:
+        过期时间戳，无法解析时返回 None
+    """
+    try:
+        return int(_decode_jwt_payload(token)['exp'])
+    except Exception:
+        return None
+
+
+def _decode_jwt_payload(token: str) -> dict:
+    """
+    解码 JWT 的 payload 部分（不校验签名）
+
+    Args:
+        token: JWT Token 字符串
+
+    Returns:
+        payload 字典
+    """
     # JWT Token 格式: header.payload.signature
     payload = token.split('.')[1]
 
@@ -86,13 +319,4 @@ def _parse_jwt_token(token: str) -> tuple[str, str]:
 
     # 解码 Base64
     decoded = base64.urlsafe_b64decode(payload)
-    payload_data = json.loads(decoded)
-
-    # 提取 User ID（移除 auth0| 前缀）
-    user_id = payload_data['sub'].replace('auth0|', '')
-
-    # 获取过期时间
-    exp_time = datetime.fromtimestamp(payload_data['exp'])
-    expiry = exp_time.strftime('%Y-%m-%d %H:%M:%S')
-
-    return user_id, expiry
+    return json.loads(decoded)
@@ -0,0 +1,255 @@
+"""
+chromedriver 服务模块
+缓存 chromedriver / Chrome 的路径，并让多个浏览器会话共用一个长期运行的 chromedriver
+"""
+
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from .config import DRIVER_PATHS_CACHE_PATH
+from .storage import read_private_json, write_private_json
+
+_paths_lock = threading.Lock()
+_paths: Optional[Dict[str, str]] = None
+
+_shared_lock = threading.Lock()
+_shared_service = None
+_shared_users = 0
+_retired_services = []  # 被替换、但可能仍有会话在使用的 chromedriver，最外层退出时停止
+
+
+def resolve_paths(options) -> Dict[str, str]:
+    """
+    获取 chromedriver 和 Chrome 的可执行文件路径
+
+    首次调用时通过 Selenium Manager 查找并写入磁盘缓存，之后直接读取缓存；
+    缓存中的文件不存在、Selenium 版本变化，或 Chrome 可执行文件变化（自动更新）时重新查找。
+
+    Args:
+        options: Chrome Options（Selenium Manager 据此选择浏览器版本）
+
+    Returns:
+        {'driver_path': str, 'browser_path': str}，查找失败的项为空字符串
+    """
+    global _paths
+    import selenium
+
+    with _paths_lock:
+        if _paths is None:
+            cached = read_private_json(DRIVER_PATHS_CACHE_PATH)
+            if _paths_usable(cached, selenium.__version__):
+                _paths = cached
+            else:
+                _paths = _discover_paths(options)
+                _paths['selenium'] = selenium.__version__
+                _paths['browser_fingerprint'] = _browser_fingerprint(_paths['browser_path'])
+                if _paths['driver_path']:
+                    write_private_json(DRIVER_PATHS_CACHE_PATH, _paths)
+        return _paths
+
+
+def invalidate_paths(stale_service=None):
+    """
+    丢弃内存和磁盘中的路径缓存，下次 resolve_paths() 时重新查找
+
+    共享的 chromedriver 正在运行时，用重新查找到的路径启动一个新的替换它。
+
+    Args:
+        stale_service: 创建会话失败时使用的共享 Service；它已被其他线程替换时
+                       说明路径已经重新查找过，不再重复
+    """
+    global _paths
+
+    with _shared_lock:
+        if stale_service is not None and stale_service is not _shared_service:
+            return
+
+        with _paths_lock:
+            _paths = None
+            try:
+                os.unlink(DRIVER_PATHS_CACHE_PATH)
+            except OSError:
+                pass
+
+        if _shared_service is not None:
+            _replace_shared_service("驱动路径已重新查找")
+
+
+def create_service():
+    """
+    使用缓存路径创建（尚未启动的）chromedriver Service
+
+    Returns:
+        selenium.webdriver.chrome.service.Service 实例
+    """
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+
+    driver_path = resolve_paths(Options())['driver_path']
+    return Service(executable_path=driver_path) if driver_path else Service()
+
+
+def shared_service():
+    """
+    返回当前共享的 chromedriver Service，未启用时返回 None
+
+    交出之前检查 chromedriver 是否仍在响应，进程已退出时重新启动一个；
+    重启失败时返回 None，调用方改为单独启动 chromedriver。
+    """
+    with _shared_lock:
+        if _shared_service is not None and not _service_alive(_shared_service):
+            _replace_shared_service("共享 chromedriver 无响应")
+        return _shared_service
+
+
+@contextmanager
+def shared_chromedriver():
+    """
+    在上下文期间启动一个共享的 chromedriver
+
+    上下文内通过 browser._create_driver 创建的所有浏览器都连接到这个
+    chromedriver，而不是各自启动一个；支持嵌套，最外层退出时停止。
+    启动失败时不共享，各浏览器照常单独启动 chromedriver。
+    """
+    global _shared_service, _shared_users
+
+    with _shared_lock:
+        if _shared_service is None:
+            try:
+                service = create_service()
+                service.start()
+                _shared_service = service
+                print(f"🧩 共享 chromedriver 已启动: {service.service_url}")
+            except Exception as e:
+                print(f"   ⚠️  无法启动共享 chromedriver，改为每个浏览器单独启动: {e}")
+        _shared_users += 1
+
+    try:
+        yield _shared_service
+    finally:
+        with _shared_lock:
+            _shared_users -= 1
+            if _shared_users == 0:
+                for service in _retired_services + [_shared_service]:
+                    if service is not None:
+                        _stop_service(service)
+                _retired_services.clear()
+                _shared_service = None
+
+
+def _replace_shared_service(reason: str):
+    """
+    用当前缓存的路径启动新的共享 chromedriver（调用方持有 _shared_lock）
+
+    旧的 chromedriver 上可能还有进行中的会话，先保留，最外层共享上下文退出时再停止；
+    新的启动失败时不再共享。
+    """
+    global _shared_service
+
+    _retired_services.append(_shared_service)
+    _shared_service = None
+    try:
+        service = create_service()
+        service.start()
+        _shared_service = service
+        print(f"🔁 {reason}，已重启共享 chromedriver: {service.service_url}")
+    except Exception as e:
+        print(f"   ⚠️  {reason}，且无法重启共享 chromedriver，改为每个浏览器单独启动: {e}")
+
+
+def _service_alive(service) -> bool:
+    try:
+        return service.is_connectable()
+    except Exception:
+        return False
+
+
+def _stop_service(service):
+    try:
+        service.stop()
+    except Exception:
+        pass
+
+
+def remote_chrome(service, options):
+    """
+    在已运行的 chromedriver 上创建一个新的 Chrome 会话
+
+    Args:
+        service: 已启动的 chromedriver Service
+        options: Chrome Options
+
+    Returns:
+        支持 execute_cdp_cmd / get_log 的 WebDriver 实例；quit() 只关闭浏览器，
+        不会停止共享的 chromedriver
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.remote_connection import ChromeRemoteConnection
+    from selenium.webdriver.remote.command import Command
+
+    class SharedServiceChrome(webdriver.Remote):
+        """连接到共享 chromedriver 的 Chrome 会话"""
+
+        def execute_cdp_cmd(self, cmd: str, cmd_args: dict):
+            return self.execute("executeCdpCommand", {'cmd': cmd, 'params': cmd_args})['value']
+
+        def get_log(self, log_type: str):
+            return self.execute(Command.GET_LOG, {'type': log_type})['value']
+
+    executor = ChromeRemoteConnection(remote_server_addr=service.service_url, keep_alive=True)
+    return SharedServiceChrome(command_executor=executor, options=options)
+
+
+def _paths_usable(cached, selenium_version: str) -> bool:
+    """检查缓存的路径是否仍然有效"""
+    if not isinstance(cached, dict) or cached.get('selenium') != selenium_version:
+        return False
+    driver_path = cached.get('driver_path')
+    if not driver_path or not os.access(driver_path, os.X_OK):
+        return False
+    browser_path = cached.get('browser_path')
+    if not browser_path:
+        return True
+    fingerprint = _browser_fingerprint(browser_path)
+    return fingerprint is not None and cached.get('browser_fingerprint') == fingerprint
+
+
+def _browser_fingerprint(browser_path: str) -> Optional[List[int]]:
+    """Chrome 可执行文件的 [修改时间, 大小]；自动更新替换文件后随之变化"""
+    if not browser_path:
+        return None
+    try:
+        st = os.stat(browser_path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _discover_paths(options) -> Dict[str, str]:
+    """通过 Selenium Manager 查找路径，不可用时回退到 PATH 中的 chromedriver"""
+    from selenium.webdriver.chrome.service import Service
+
+    try:
+        from selenium.webdriver.common.driver_finder import DriverFinder
+
+        if hasattr(DriverFinder, 'get_driver_path'):
+            # Selenium >= 4.20
+            finder = DriverFinder(Service(), options)
+            return {
+                'driver_path': finder.get_driver_path(),
+                'browser_path': finder.get_browser_path() or ''
+            }
+        # Selenium 4.11 - 4.19
+        return {
+            'driver_path': DriverFinder.get_path(Service(), options),
+            'browser_path': getattr(options, 'binary_location', '') or ''
+        }
+    except Exception as e:
+        print(f"   ⚠️  Selenium Manager 查找 chromedriver 失败: {e}")
+        return {
+            'driver_path': shutil.which('chromedriver') or '',
+            'browser_path': ''
+        }
@@ -0,0 +1,288 @@
+"""
+HTTP 后端模块
+不启动浏览器，直接携带会话 Cookie 通过 HTTP 验证登录并创建 API Key
+"""
+
+import http.client
+import json
+import re
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit, urljoin
+
+from .config import (
+    CURSOR_DASHBOARD,
+    CURSOR_API_KEY_CREATE_URL,
+    API_KEY_VALIDATE_URL,
+    COOKIE_NAME,
+    COOKIE_DOMAIN,
+    AUTHENTICATOR_HOST,
+    API_KEY_PREFIX,
+    API_KEY_PATTERN,
+    DEFAULT_TIMEOUT,
+    HTTP_USER_AGENT
+)
+from .timing import timed
+
+MAX_REDIRECTS = 5
+
+
+class ConnectionPool:
+    """
+    按 (scheme, host, port) 复用 keep-alive 连接的简单连接池
+    """
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT):
+        self.timeout = timeout
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def request(self, method: str, url: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        发送请求并读取完整响应
+
+        连接在响应读取完毕后放回池中；复用的连接已被服务端关闭时自动重连一次。
+
+        Args:
+            method: HTTP 方法
+            url: 完整 URL
+            body: 请求体
+            headers: 请求头
+
+        Returns:
+            (状态码, 小写键的响应头字典, 响应体)
+        """
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+
+        for attempt in range(2):
+            conn, reused = self._checkout(key)
+            try:
+                conn.request(method, path, body=body, headers=headers or {})
+                response = conn.getresponse()
+                data = response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if reused and attempt == 0:
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+
+            response_headers = {k.lower(): v for k, v in response.getheaders()}
+            if response.will_close:
+                conn.close()
+            else:
+                self._checkin(key, conn)
+            return response.status, response_headers, data
+
+        raise ConnectionError(f"无法连接 {parts.netloc}")
+
+    def close(self):
+        """关闭所有空闲连接"""
+        with self._lock:
+            connections = [c for conns in self._idle.values() for c in conns]
+            self._idle.clear()
+        for conn in connections:
+            conn.close()
+
+    def _checkout(self, key):
+        with self._lock:
+            conns = self._idle.get(key)
+            if conns:
+                return conns.pop(), True
+
+        scheme, host, port = key
+        if scheme == 'https':
+            conn = http.client.HTTPSConnection(host, port, timeout=self.timeout)
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=self.timeout)
+        return conn, False
+
+    def _checkin(self, key, conn):
+        with self._lock:
+            self._idle.setdefault(key, []).append(conn)
+
+
+# 进程内共享，批量模式下多个账户复用同一批连接
+_pool = ConnectionPool()
+
+
+def _session_headers(info: Dict[str, str]) -> Dict[str, str]:
+    """构造携带会话 Cookie 的请求头"""
+    return {
+        'Cookie': f"{COOKIE_NAME}={info['user_id']}::{info['token']}",
+        'User-Agent': HTTP_USER_AGENT,
+        'Accept': 'text/html,application/json;q=0.9,*/*;q=0.8',
+        'Connection': 'keep-alive'
+    }
+
+
+@timed("http:verify_login")
+def verify_login_http(info: Dict[str, str]) -> bool:
+    """
+    通过 HTTP 请求 Dashboard 验证会话 Cookie 是否有效
+
+    只跟随同源或 Cursor 域名下的重定向，且离开原来的源后不再携带会话 Cookie；
+    只有最终停留在 Dashboard 本身才视为会话有效。
+
+    Args:
+        info: 用户信息字典
+
+    Returns:
+        会话有效返回 True；被重定向到认证页面或其他页面返回 False
+
+    Raises:
+        无法判断时（网络错误、非预期状态码、重定向到其他域名）抛出异常
+    """
+    url = CURSOR_DASHBOARD
+    headers = _session_headers(info)
+
+    for _ in range(MAX_REDIRECTS):
+        status, response_headers, _body = _pool.request('GET', url, headers=headers)
+
+        if status in (301, 302, 303, 307, 308):
+            location = urljoin(url, response_headers.get('location', ''))
+            if AUTHENTICATOR_HOST in location:
+                return False
+            if not _same_origin(location, url) and not _is_cursor_host(location):
+                raise RuntimeError(f"Dashboard 重定向到非 Cursor 域名 {urlsplit(location).netloc}")
+            if not _same_origin(location, url):
+                # 会话 Cookie 只发往 Dashboard 所在的源
+                headers = {k: v for k, v in headers.items() if k != 'Cookie'}
+            url = location
+            continue
+
+        if status == 200:
+            return _same_page(url, CURSOR_DASHBOARD)
+        if status in (401, 403):
+            return False
+        raise RuntimeError(f"Dashboard 返回非预期状态码 {status}")
+
+    raise RuntimeError("Dashboard 重定向次数过多")
+
+
+def _same_origin(a: str, b: str) -> bool:
+    pa, pb = urlsplit(a), urlsplit(b)
+    return (pa.scheme, pa.hostname, pa.port) == (pb.scheme, pb.hostname, pb.port)
+
+
+def _is_cursor_host(url: str) -> bool:
+    """URL 是否位于 Cookie 所属的 Cursor 域名（COOKIE_DOMAIN）下"""
+    host = (urlsplit(url).hostname or '').lower()
+    domain = COOKIE_DOMAIN.lstrip('.').lower()
+    return host == domain or host.endswith('.' + domain)
+
+
+def _same_page(a: str, b: str) -> bool:
+    """忽略查询参数和末尾斜杠比较两个 URL 是否指向同一页面"""
+    pa, pb = urlsplit(a), urlsplit(b)
+    return (_same_origin(a, b) and
+            (pa.path.rstrip('/') or '/') == (pb.path.rstrip('/') or '/'))
+
+
+@timed("http:create_api_key")
+def create_api_key_http(info: Dict[str, str]) -> Optional[str]:
+    """
+    通过 HTTP 接口创建 API Key
+
+    Args:
+        info: 用户信息字典
+
+    Returns:
+        成功返回 API Key 字符串，失败返回 None
+    """
+    api_key_name = f"{API_KEY_PREFIX}{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    parts = urlsplit(CURSOR_API_KEY_CREATE_URL)
+
+    headers = _session_headers(info)
+    headers.update({
+        'Content-Type': 'application/json',
+        'Accept': 'application/json',
+        'Origin': f"{parts.scheme}://{parts.netloc}",
+        'Referer': CURSOR_DASHBOARD
+    })
+    body = json.dumps({'name': api_key_name}).encode('utf-8')
+
+    try:
+        status, _headers, data = _pool.request('POST', CURSOR_API_KEY_CREATE_URL, body=body, headers=headers)
+    except Exception as e:
+        print(f"   ⚠️  HTTP 创建 API Key 失败: {e}")
+        return None
+
+    if status != 200:
+        print(f"   ⚠️  HTTP 创建 API Key 失败: 状态码 {status}")
+        return None
+
+    match = re.search(API_KEY_PATTERN, data.decode('utf-8', errors='replace'))
+    if not match:
+        print("   ⚠️  HTTP 响应中未找到 API Key")
+        return None
+
+    print(f"   → API Key 名称: {api_key_name}")
+    return match.group(0)
+
+
+@timed("http:validate_api_key", check=lambda valid: valid is not None)
+def validate_api_key_http(api_key: str) -> Optional[bool]:
+    """
+    用一次 GET 请求检查 API Key 是否仍然有效
+
+    Args:
+        api_key: API Key 字符串
+
+    Returns:
+        有效返回 True，被拒绝（401/403）返回 False，无法判断返回 None
+    """
+    headers = {
+        'Authorization': f"Bearer {api_key}",
+        'User-Agent': HTTP_USER_AGENT,
+        'Accept': 'application/json',
+        'Connection': 'keep-alive'
+    }
+    try:
+        status, _headers, _body = _pool.request('GET', API_KEY_VALIDATE_URL, headers=headers)
+    except Exception as e:
+        print(f"   ⚠️  API Key 校验请求失败: {e}")
+        return None
+
+    if status == 200:
+        return True
+    if status in (401, 403):
+        return False
+    print(f"   ⚠️  API Key 校验返回非预期状态码 {status}")
+    return None
+
+
+@timed("http_login")
+def login_via_http(info: Dict[str, str]) -> Optional[str]:
+    """
+    不启动浏览器完成会话验证和 API Key 创建
+
+    Args:
+        info: 用户信息字典
+
+    Returns:
+        成功返回 API Key；会话无效或任一步骤失败返回 None
+    """
+    print("\n⚡ 尝试 HTTP 快速通道...")
+    try:
+        if not verify_login_http(info):
+            print("   ⚠️  会话 Cookie 无效（被重定向到认证页面）")
+            return None
+        print("   ✅ 会话验证通过")
+    except Exception as e:
+        print(f"   ⚠️  HTTP 会话验证失败: {e}")
+        return None
+
+    print("   → 正在创建 API Key...")
+    api_key = create_api_key_http(info)
+    if api_key:
+        print("   ✅ API Key 创建成功！")
+    return api_key
@@ -0,0 +1,121 @@
+"""
+元素定位模块
+按钮候选文本的一次性查找与自学习缓存
+"""
+
+import threading
+from typing import List
+
+from .config import DEFAULT_TIMEOUT, SELECTOR_CACHE_ENABLED, SELECTOR_CACHE_PATH
+from .storage import read_private_json, write_private_json
+from .timing import note_retry
+from .waits import wait_for
+
+# 各类按钮的候选文本（按默认优先级排列）
+CREATE_BUTTON_LABELS = ["New User API Key", "New API Key", "User API Key"]
+SAVE_BUTTON_LABELS = ["Save", "Create", "确认", "保存", "创建"]
+
+# 在页面内按优先级一次检查所有候选文本，返回第一个可见且可用的按钮及其文本
+_FIND_BUTTON_SCRIPT = """
+var labels = arguments[0];
+var buttons = document.querySelectorAll('button');
+for (var i = 0; i < labels.length; i++) {
+    for (var j = 0; j < buttons.length; j++) {
+        var button = buttons[j];
+        if (button.disabled || !button.getClientRects().length) {
+            continue;
+        }
+        if ((button.textContent || '').indexOf(labels[i]) !== -1) {
+            return [button, labels[i]];
+        }
+    }
+}
+return null;
+"""
+
+_cache_lock = threading.Lock()
+_learned = None
+
+
+def preferred_order(kind: str, labels: List[str]) -> List[str]:
+    """
+    将上次命中的文本排在候选列表最前面
+
+    Args:
+        kind: 按钮类别，如 "create_button"
+        labels: 默认候选文本
+
+    Returns:
+        调整顺序后的候选文本
+    """
+    last = _learned_labels().get(kind)
+    if last in labels:
+        return [last] + [label for label in labels if label != last]
+    return list(labels)
+
+
+def remember(kind: str, label: str):
+    """
+    记录命中的按钮文本，与缓存不同时才写盘
+
+    Args:
+        kind: 按钮类别
+        label: 命中的文本
+    """
+    if not SELECTOR_CACHE_ENABLED:
+        return
+
+    with _cache_lock:
+        learned = _learned_labels()
+        if learned.get(kind) == label:
+            return
+        learned[kind] = label
+        write_private_json(SELECTOR_CACHE_PATH, learned)
+
+
+def find_button(driver, kind: str, labels: List[str], timeout: float = DEFAULT_TIMEOUT):
+    """
+    查找文本包含任一候选的按钮
+
+    所有候选文本在一次 JS 调用中同时检查，按缓存中的优先级返回第一个匹配；
+    命中的文本与缓存不一致时（页面改版）自动更新缓存。
+
+    Args:
+        driver: Selenium WebDriver 实例
+        kind: 按钮类别，用作缓存键
+        labels: 候选文本
+        timeout: 等待按钮出现的超时时间（秒），0 表示只查询一次
+
+    Returns:
+        找到返回 WebElement，否则返回 None
+    """
+    ordered = preferred_order(kind, labels)
+
+    def _query(d):
+        return d.execute_script(_FIND_BUTTON_SCRIPT, ordered)
+
+    try:
+        match = wait_for(driver, timeout).until(_query) if timeout else _query(driver)
+    except Exception:
+        match = None
+
+    if not match:
+        return None
+
+    element, label = match
+    print(f"   ✅ 找到按钮: {label}")
+    if label != ordered[0]:
+        # 缓存的首选文本已失效，重新学习
+        note_retry()
+        print(f"   → 按钮文本已变化，记住新文本: {label}")
+    remember(kind, label)
+    return element
+
+
+def _learned_labels() -> dict:
+    """延迟加载缓存的按钮文本"""
+    global _learned
+    if _learned is None:
+        cached = read_private_json(SELECTOR_CACHE_PATH) if SELECTOR_CACHE_ENABLED else None
+        _learned = cached if isinstance(cached, dict) else {}
+    return _learned
@@ -0,0 +1,166 @@
+"""
+异步流水线模块
+Token 预检通过后，浏览器启动与已有 API Key 的校验并行，Cookie 注入前汇合；
+收尾阶段写入环境变量与关闭浏览器并行
+"""
+
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from .config import API_KEY_EXTRACTION, API_KEY_REUSE, BROWSER_PROFILE, SESSION_SNAPSHOT
+from .database import get_cursor_token, validate_token
+from .timing import timed
+
+
+@timed("pipeline", check=lambda result: result['success'])
+def run_pipeline(headless: bool = True, extraction: str = API_KEY_EXTRACTION,
+                 profile: str = BROWSER_PROFILE, db_path: Optional[str] = None,
+                 on_token=None, reuse_key: bool = API_KEY_REUSE,
+                 session_snapshot: bool = SESSION_SNAPSHOT) -> Dict[str, Any]:
+    """
+    以流水线方式执行单账户登录
+
+    先读取 Token 并预检（命中本地缓存时只需几毫秒），过期或格式错误的 Token
+    不会启动任何浏览器。预检通过后，Chrome 与 chromedriver 在后台线程启动，
+    同时校验已有 API Key；两者在设置 Cookie 前汇合。API Key 创建后，
+    写入 ~/.zshrc 与关闭浏览器同样并行执行。
+
+    Args:
+        headless: 是否使用无头模式
+        extraction: API Key 提取方式，"dom" 或 "network"
+        profile: 浏览器配置档，"default" 或 "lean"
+        db_path: 数据库路径，默认使用配置中的 DB_PATH
+        on_token: 读取到账户信息后的回调（如打印账户信息），在等待浏览器前调用
+        reuse_key: 已记录的 API Key 仍然有效时复用（在浏览器启动期间校验，
+                   复用时预先启动的浏览器直接关闭）
+        session_snapshot: 恢复并保存会话快照
+
+    Returns:
+        结果字典，格式同 login_account，另含：
+        {
+            'info': Optional[Dict],    # 账户信息
+            'saved_seconds': float     # 按本次各任务耗时估算的节省时间（秒）
+        }
+    """
+    return asyncio.run(_run(headless, extraction, profile, db_path, on_token, reuse_key,
+                            session_snapshot))
+
+
+async def _run(headless: bool, extraction: str, profile: str,
+               db_path: Optional[str], on_token, reuse_key: bool,
+               session_snapshot: bool) -> Dict[str, Any]:
+    from .browser import (
+        _create_driver,
+        _ensure_selenium_installed,
+        _export_api_key,
+        _release_driver,
+        _run_login_steps
+    )
+    from .api_key import update_zshrc_with_api_key
+    from .credentials import find_reusable_api_key
+
+    result = {
+        'email': None,
+        'success': False,
+        'api_key': None,
+        'reused': False,
+        'invalid_token': False,
+        'error': None,
+        'info': None,
+        'saved_seconds': 0.0
+    }
+
+    # Token 预检：在启动任何浏览器之前拒绝过期或格式错误的 Token
+    info = get_cursor_token(db_path)
+    result['info'] = info
+    if not info:
+        result['error'] = "无法获取账户信息"
+        return result
+    result['email'] = info['email']
+    if on_token:
+        on_token(info)
+    problem = validate_token(info['token'])
+    if problem:
+        print(f"\n❌ Token 预检失败: {problem}")
+        result['invalid_token'] = True
+        result['error'] = f"Token 无效: {problem}"
+        return result
+
+    if not _ensure_selenium_installed():
+        result['error'] = "Selenium 未安装"
+        return result
+
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="pipeline") as executor:
+        def _in_thread(func, *args, **kwargs):
+            return loop.run_in_executor(executor, _measured(func, *args, **kwargs))
+
+        # 阶段一：启动浏览器 ‖ 校验已有 API Key
+        print("\n🚀 启动浏览器" + ("，同时校验已有 API Key..." if reuse_key else "..."))
+        started = time.monotonic()
+        driver_task = _in_thread(_create_driver, headless,
+                                 capture_network=(extraction == "network"), profile=profile)
+        reusable_key = None
+        if reuse_key:
+            reusable_key, reuse_seconds = await _in_thread(find_reusable_api_key, info)
+
+        driver = None
+        try:
+            driver, launch_seconds = await driver_task
+        except Exception as e:
+            result['error'] = f"浏览器启动失败: {e}"
+            print(f"\n❌ {result['error']}")
+            return result
+        if reuse_key:
+            result['saved_seconds'] += _saved(started, launch_seconds, reuse_seconds)
+
+        # 阶段二：在浏览器中登录并创建 API Key（环境变量稍后写入）
+        try:
+            if reusable_key and headless:
+                result['success'] = True
+                result['reused'] = True
+                result['api_key'] = _export_api_key(reusable_key, update_env=False, created=False)
+            else:
+                await loop.run_in_executor(
+                    executor,
+                    functools.partial(_run_login_steps, driver, info, result, headless,
+                                      update_env=False, extraction=extraction,
+                                      api_key=reusable_key,
+                                      session_snapshot=session_snapshot)
+                )
+        except Exception as e:
+            print(f"\n❌ 自动登录失败: {e}")
+            result['error'] = str(e)
+
+        # 阶段三：写入 ~/.zshrc ‖ 关闭浏览器
+        finally:
+            started = time.monotonic()
+            teardown = [_in_thread(_release_driver, driver, headless)]
+            if result['api_key']:
+                print("\n🔟 写入环境变量...")
+                teardown.append(_in_thread(update_zshrc_with_api_key, result['api_key']))
+            finished = await asyncio.gather(*teardown, return_exceptions=True)
+            durations = [item[1] for item in finished if not isinstance(item, BaseException)]
+            if len(durations) > 1:
+                result['saved_seconds'] += _saved(started, *durations)
+
+    print(f"\n⏱️  并行执行估算节省约 {result['saved_seconds'] * 1000:.0f} ms"
+          "（各并行任务耗时之和减去墙钟时间）")
+    return result
+
+
+def _measured(func, *args, **kwargs):
+    """包装函数，使其返回 (结果, 耗时秒数)"""
+    def _call():
+        started = time.monotonic()
+        value = func(*args, **kwargs)
+        return value, time.monotonic() - started
+    return _call
+
+
+def _saved(started: float, *durations: float) -> float:
+    """各任务串行耗时之和减去并行墙钟耗时"""
+    return max(0.0, sum(durations) - (time.monotonic() - started))
@@ -0,0 +1,264 @@
+"""
+浏览器会话池模块
+预先启动若干无头 Chrome，在多次登录之间复用，避免重复冷启动
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+
+from .config import (
+    CURSOR_WEBSITE,
+    CURSOR_DASHBOARD,
+    DEFAULT_TIMEOUT,
+    POOL_SIZE,
+    POOL_MAX_IDLE
+)
+
+
+class DriverPool:
+    """
+    无头 Chrome 会话池
+
+    - acquire() 借出一个健康的浏览器，必要时启动新的实例；首次调用时在后台
+      预启动其余浏览器，从不借用浏览器的调用方（HTTP 通道、复用已有 Key）不承担冷启动
+    - release() 清理 Cookie 与存储后归还，清理失败则直接销毁
+    - 空闲超过 max_idle 秒或健康检查失败的浏览器在 acquire() 或 evict_idle() 时淘汰；
+      长时间运行的调用方应定期调用 evict_idle()
+    """
+
+    def __init__(self, size: int = POOL_SIZE, max_idle: float = POOL_MAX_IDLE,
+                 factory: Optional[Callable] = None, **driver_options):
+        """
+        Args:
+            size: 池中浏览器数量上限
+            max_idle: 最大空闲时间（秒）
+            factory: 创建浏览器的函数，默认启动无头 Chrome
+            driver_options: 使用默认 factory 时传给 browser._create_driver 的参数，
+                            如 capture_network=True
+        """
+        if factory is None:
+            from .browser import _create_driver
+            factory = lambda: _create_driver(headless=True, **driver_options)
+
+        self.size = size
+        self.max_idle = max_idle
+        self._factory = factory
+        self._idle = deque()  # (driver, 归还时间)
+        self._total = 0
+        self._closed = False
+        self._warmers = None  # 首次 acquire 时启动的后台预启动线程
+        self._cond = threading.Condition()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def warm(self, count: Optional[int] = None):
+        """
+        预先启动浏览器填充会话池
+
+        Args:
+            count: 预启动数量，默认填满整个池
+        """
+        target = self.size if count is None else min(count, self.size)
+        while True:
+            with self._cond:
+                if self._closed or self._total >= target:
+                    return
+                self._total += 1
+            driver = self._launch()
+            if driver is None:
+                return
+            with self._cond:
+                closed = self._closed
+                if closed:
+                    self._total -= 1
+                else:
+                    self._idle.append((driver, time.monotonic()))
+                    self._cond.notify()
+            if closed:
+                # 预启动期间会话池已关闭
+                self._quit(driver)
+                return
+
+    def acquire(self, timeout: float = DEFAULT_TIMEOUT):
+        """
+        借出一个浏览器
+
+        Args:
+            timeout: 池已满时等待归还的超时时间（秒）
+
+        Returns:
+            Selenium WebDriver 实例
+        """
+        self._warm_in_background()
+
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("会话池已关闭")
+
+                driver = None
+                stale = []
+                while self._idle:
+                    candidate, released_at = self._idle.pop()
+                    if time.monotonic() - released_at > self.max_idle:
+                        stale.append(candidate)
+                    else:
+                        driver = candidate
+                        break
+
+                launch = driver is None and self._total - len(stale) < self.size
+                self._total -= len(stale)
+                if launch:
+                    self._total += 1
+
+                if driver is None and not launch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError("等待会话池中的浏览器超时")
+                    if not stale:
+                        self._cond.wait(remaining)
+                        continue
+
+            for candidate in stale:
+                self._quit(candidate)
+
+            if launch:
+                driver = self._launch()
+                if driver is None:
+                    raise RuntimeError("无法启动浏览器")
+                return driver
+
+            if driver is not None:
+                if self._is_healthy(driver):
+                    return driver
+                self._discard(driver)
+
+    def release(self, driver, discard: bool = False):
+        """
+        归还浏览器，清理其 Cookie 与存储
+
+        Args:
+            driver: 借出的 Selenium WebDriver 实例
+            discard: 是否直接销毁而不放回池中
+        """
+        if discard or self._closed or not self._reset(driver):
+            self._discard(driver)
+            return
+
+        with self._cond:
+            self._idle.append((driver, time.monotonic()))
+            self._cond.notify()
+
+    def evict_idle(self) -> int:
+        """
+        淘汰空闲超时的浏览器
+
+        Returns:
+            被淘汰的浏览器数量
+        """
+        now = time.monotonic()
+        with self._cond:
+            keep = deque(item for item in self._idle if now - item[1] <= self.max_idle)
+            stale = [driver for driver, released_at in self._idle if now - released_at > self.max_idle]
+            self._idle = keep
+            self._total -= len(stale)
+            self._cond.notify_all()
+
+        for driver in stale:
+            self._quit(driver)
+        return len(stale)
+
+    def close(self):
+        """关闭会话池并退出所有空闲浏览器（等待进行中的预启动结束）"""
+        with self._cond:
+            self._closed = True
+            drivers = [driver for driver, _ in self._idle]
+            self._idle.clear()
+            self._total -= len(drivers)
+            warmers = self._warmers or []
+            self._cond.notify_all()
+
+        for driver in drivers:
+            self._quit(driver)
+        # 关闭后才启动完成的浏览器由 warm() 自行退出
+        for thread in warmers:
+            thread.join()
+
+    def _warm_in_background(self):
+        """首次借用时并行预启动其余浏览器（只执行一次）"""
+        with self._cond:
+            if self._warmers is not None or self._closed:
+                return
+            self._warmers = [threading.Thread(target=self.warm, name=f"pool-warm-{i}")
+                             for i in range(self.size - 1)]
+            # 在锁内启动，close() 拿到的线程一定已经启动
+            for thread in self._warmers:
+                thread.start()
+
+    def _launch(self):
+        """启动新浏览器，失败时释放占用的名额"""
+        try:
+            return self._factory()
+        except Exception as e:
+            print(f"   ⚠️  会话池启动浏览器失败: {e}")
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            return None
+
+    def _discard(self, driver):
+        """销毁浏览器并释放名额"""
+        self._quit(driver)
+        with self._cond:
+            self._total -= 1
+            self._cond.notify()
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _is_healthy(driver) -> bool:
+        """健康检查：浏览器仍能响应命令"""
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    @staticmethod
+    def _reset(driver) -> bool:
+        """清理 Cookie、本地存储并回到空白页"""
+        try:
+            try:
+                driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+                for origin in {CURSOR_WEBSITE, CURSOR_DASHBOARD}:
+                    driver.execute_cdp_cmd("Storage.clearDataForOrigin", {
+                        "origin": _origin_of(origin),
+                        "storageTypes": "all"
+                    })
+            except Exception:
+                driver.delete_all_cookies()
+                driver.execute_script(
+                    "try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}"
+                )
+            driver.get("about:blank")
+            return True
+        except Exception:
+            return False
+
+
+def _origin_of(url: str) -> str:
+    """提取 URL 的 origin（scheme://host[:port]）"""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
@@ -0,0 +1,188 @@
+"""
+性能分析模块
+用 cProfile 包裹登录流程，输出 .pstats 与火焰图工具可读的折叠栈，
+并按登录步骤汇总墙钟耗时的去向（Python、Selenium HTTP 客户端、等待浏览器）
+"""
+
+import cProfile
+import os
+import pstats
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+from .config import PROFILER_OUTPUT_PREFIX
+
+# 汇总表中单独列出的步骤函数
+STEP_FUNCTIONS = (
+    'get_cursor_token',
+    'auto_login_with_selenium',
+    'login_account',
+    '_set_login_cookie',
+    '_verify_login',
+    'create_api_key',
+    '_extract_api_key',
+)
+
+# 自身耗时计为「等待」的内置函数：阻塞在 chromedriver 的 HTTP 响应或轮询间隔上
+_WAIT_BUILTINS = ('recv', 'recv_into', 'select', 'poll', 'sleep', 'connect', 'acquire', 'wait')
+# 文件路径包含这些片段的函数计为 Selenium HTTP 客户端
+_CLIENT_PATHS = ('selenium', 'urllib3', os.path.join('http', 'client.py'), 'socket.py', 'ssl.py')
+
+# 折叠栈遍历时忽略占比过小的分支，避免调用图分叉导致路径数爆炸
+_MIN_PATH_SECONDS = 1e-5
+
+FuncKey = Tuple[str, int, str]
+
+
+@contextmanager
+def profiled(output_prefix: str = PROFILER_OUTPUT_PREFIX) -> Iterator[cProfile.Profile]:
+    """
+    在上下文期间启用 cProfile，结束时写出结果并打印步骤耗时
+
+    只分析进入上下文的线程；流水线、批量和守护模式中在工作线程执行的步骤不会计入。
+
+    Args:
+        output_prefix: 输出文件前缀，生成 <prefix>.pstats 和 <prefix>.folded
+
+    Yields:
+        cProfile.Profile 实例
+    """
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield profile
+    finally:
+        profile.disable()
+        write_profile(profile, output_prefix)
+
+
+def write_profile(profile: cProfile.Profile, output_prefix: str):
+    """
+    写出 .pstats 与折叠栈文件，并打印步骤耗时汇总
+
+    Args:
+        profile: 已停止的 cProfile.Profile
+        output_prefix: 输出文件前缀
+    """
+    stats = pstats.Stats(profile)
+    pstats_path = f"{output_prefix}.pstats"
+    folded_path = f"{output_prefix}.folded"
+
+    stats.dump_stats(pstats_path)
+    stacks = collapse_stacks(stats)
+    with open(folded_path, 'w', encoding='utf-8') as f:
+        for stack, seconds in sorted(stacks.items()):
+            micros = int(seconds * 1e6)
+            if micros > 0:
+                f.write(";".join(_label(func) for func in stack) + f" {micros}\n")
+
+    print(f"\n🔬 性能分析结果已写入 {pstats_path} 和 {folded_path}")
+    print(f"   火焰图: flamegraph.pl {folded_path} > profile.svg")
+    print(format_step_summary(stats, stacks))
+
+
+def collapse_stacks(stats: pstats.Stats) -> Dict[Tuple[FuncKey, ...], float]:
+    """
+    由 cProfile 的调用图重建折叠栈
+
+    cProfile 只记录「调用者 → 被调用者」的边，这里假设一个函数在各调用路径上的
+    耗时与该路径经过的边成比例，从没有调用者的根函数逐层展开；递归调用不重复展开。
+
+    Args:
+        stats: pstats.Stats
+
+    Returns:
+        {调用栈（从外到内的函数键）: 栈顶函数的自身耗时（秒）}
+    """
+    entries = stats.stats
+    children: Dict[FuncKey, List[Tuple[FuncKey, float]]] = defaultdict(list)
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            children[caller].append((func, edge[3]))
+
+    stacks: Dict[Tuple[FuncKey, ...], float] = defaultdict(float)
+
+    def _walk(func: FuncKey, stack: Tuple[FuncKey, ...], share: float):
+        _, _, self_time, total_time, _ = entries[func]
+        stack = stack + (func,)
+        stacks[stack] += self_time * share
+        for child, edge_time in children.get(func, ()):
+            child_total = entries[child][3]
+            if child in stack or child_total <= 0:
+                continue
+            child_share = share * edge_time / child_total
+            if child_total * child_share >= _MIN_PATH_SECONDS:
+                _walk(child, stack, child_share)
+
+    for func, (_, _, _, _, callers) in entries.items():
+        if not callers:
+            _walk(func, (), 1.0)
+    return stacks
+
+
+def format_step_summary(stats: pstats.Stats, stacks: Dict[Tuple[FuncKey, ...], float]) -> str:
+    """
+    按步骤函数汇总墙钟耗时
+
+    「总耗时」取自 cProfile 的累计时间；其中 Python / Selenium HTTP / 等待 三部分
+    按折叠栈中最内层的步骤函数归属，为估算值。
+
+    Args:
+        stats: pstats.Stats
+        stacks: collapse_stacks() 的结果
+
+    Returns:
+        可打印的汇总表
+    """
+    calls: Dict[str, int] = defaultdict(int)
+    totals: Dict[str, float] = defaultdict(float)
+    for func, (_, ncalls, _, total_time, _) in stats.stats.items():
+        if func[2] in STEP_FUNCTIONS:
+            calls[func[2]] += ncalls
+            totals[func[2]] += total_time
+
+    split: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    for stack, seconds in stacks.items():
+        step = next((func[2] for func in reversed(stack) if func[2] in STEP_FUNCTIONS), None)
+        if step:
+            split[step][_category(stack[-1])] += seconds
+
+    lines = [
+        "",
+        f"{'step':<26}{'calls':>6}{'total (s)':>11}{'python':>9}{'http':>9}{'wait':>9}",
+        "-" * 70,
+    ]
+    for step in STEP_FUNCTIONS:
+        if step not in totals:
+            continue
+        parts = split[step]
+        lines.append(f"{step:<26}{calls[step]:>6}{totals[step]:>11.3f}"
+                     f"{parts['python']:>9.3f}{parts['http']:>9.3f}{parts['wait']:>9.3f}")
+    lines.append("-" * 70)
+    lines.append(f"{'profiled':<32}{stats.total_tt:>11.3f}")
+    lines.append("python：本包及其他 Python 代码；http：Selenium/urllib3 客户端；"
+                 "wait：阻塞在 chromedriver 响应或轮询间隔（即浏览器端耗时）")
+    return "\n".join(lines)
+
+
+def _category(func: FuncKey) -> str:
+    """按栈顶函数把自身耗时归入 python / http / wait"""
+    filename, _, name = func
+    if filename == '~':
+        if any(f"'{method}'" in name or f".{method}" in name for method in _WAIT_BUILTINS):
+            return 'wait'
+        return 'python'
+    if any(part in filename for part in _CLIENT_PATHS):
+        return 'http'
+    return 'python'
+
+
+def _label(func: FuncKey) -> str:
+    """折叠栈中的帧名称（分号是栈分隔符，需要替换）"""
+    filename, line, name = func
+    if filename == '~':
+        label = name
+    else:
+        label = f"{name} ({os.path.basename(filename)}:{line})"
+    return label.replace(';', ',')
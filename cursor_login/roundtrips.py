@@ -0,0 +1,209 @@
+"""
+WebDriver 往返统计模块
+统计每个登录步骤向 chromedriver 发出的命令数与耗时，并支持按步骤设定命令数上限
+
+find_element、is_displayed、.text、get_cookies 等每次调用都是一次到 chromedriver
+的 HTTP 往返；WebElement 的方法同样经由其所属 driver 的 execute() 发出，
+因此只需包装 driver 实例的 execute() 即可统计全部命令。
+"""
+
+import threading
+import time
+from typing import Dict, Mapping, Optional, Tuple
+
+from .config import ROUNDTRIP_ACCOUNTING
+from .timing import current_path
+
+# 不在任何计时步骤内发出的命令归入该名称
+NO_STEP = "(none)"
+
+# 一次完整登录（设置 Cookie → 验证 → 创建并提取 API Key）各步骤的命令数预算，
+# tests/test_roundtrips.py 据此检查；增加往返的改动应同时说明理由并调整这里。
+# 真实 Chrome 上页面等待可能多轮询几次，命令行检查时可适当放宽。
+LOGIN_BUDGETS = {
+    'login_account': 24,
+    'set_login_cookie': 4,
+    'verify_login': 6,
+    'create_api_key': 12,
+    'submit_form': 3,
+    'extract_api_key': 2,
+}
+
+_enabled = ROUNDTRIP_ACCOUNTING
+
+
+class BudgetExceeded(AssertionError):
+    """步骤的 WebDriver 命令数超过预算"""
+
+
+class RoundTripCounter:
+    """
+    线程安全的 WebDriver 命令统计器
+
+    按 (步骤路径, 命令) 聚合次数与耗时；步骤路径是发出命令时从外到内的计时步骤名称。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[Tuple[str, ...], str], list] = {}  # -> [次数, 耗时秒数]
+
+    def record(self, path: Tuple[str, ...], command: str, seconds: float):
+        with self._lock:
+            entry = self._entries.setdefault((path or (NO_STEP,), command), [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def reset(self):
+        with self._lock:
+            self._entries = {}
+
+    def by_step(self) -> Dict[str, Dict[str, Tuple[int, float]]]:
+        """
+        按最内层步骤汇总（不含外层步骤）
+
+        Returns:
+            {步骤: {命令: (次数, 耗时秒数)}}
+        """
+        steps: Dict[str, Dict[str, Tuple[int, float]]] = {}
+        with self._lock:
+            for (path, command), (count, seconds) in self._entries.items():
+                commands = steps.setdefault(path[-1], {})
+                previous = commands.get(command, (0, 0.0))
+                commands[command] = (previous[0] + count, previous[1] + seconds)
+        return steps
+
+    def count(self, step: str) -> int:
+        """步骤内（包括其中嵌套的步骤）发出的命令总数"""
+        with self._lock:
+            return sum(count for (path, _), (count, _) in self._entries.items() if step in path)
+
+    def summary(self) -> str:
+        """按最内层步骤汇总的命令数、总耗时和最常见的命令"""
+        lines = [
+            "",
+            f"{'step':<26}{'cmds':>6}{'total (ms)':>12}{'avg (ms)':>10}  top commands",
+            "-" * 90,
+        ]
+        total_count = 0
+        total_seconds = 0.0
+        steps = self.by_step()
+        for step in sorted(steps, key=lambda s: -sum(c for c, _ in steps[s].values())):
+            commands = steps[step]
+            count = sum(c for c, _ in commands.values())
+            seconds = sum(s for _, s in commands.values())
+            top = sorted(commands.items(), key=lambda item: -item[1][0])[:3]
+            top_text = ", ".join(f"{name}×{c}" for name, (c, _) in top)
+            lines.append(f"{step:<26}{count:>6}{seconds * 1000:>12.1f}"
+                         f"{seconds * 1000 / count:>10.2f}  {top_text}")
+            total_count += count
+            total_seconds += seconds
+        lines.append("-" * 90)
+        lines.append(f"{'total':<26}{total_count:>6}{total_seconds * 1000:>12.1f}")
+        return "\n".join(lines)
+
+    def assert_budget(self, budgets: Mapping[str, int]):
+        """
+        检查各步骤的命令数不超过预算
+
+        Args:
+            budgets: {步骤名称: 最大命令数}，步骤名称与 timing 的 span 名称一致；
+                     计数包括步骤中嵌套的步骤（如 verify_login 中的 wait:dashboard）
+
+        Raises:
+            BudgetExceeded: 任一步骤超出预算（消息中列出所有超出的步骤）
+        """
+        over = []
+        for step, limit in budgets.items():
+            used = self.count(step)
+            if used > limit:
+                over.append(f"{step}: {used} > {limit}")
+        if over:
+            raise BudgetExceeded("WebDriver 命令数超出预算：" + "; ".join(over))
+
+
+# 进程级默认统计器
+counter = RoundTripCounter()
+
+
+def assert_budget(budgets: Mapping[str, int]):
+    """
+    检查进程级统计器中各步骤的命令数不超过预算
+
+    用法（测试中）：
+        roundtrips.enable()
+        roundtrips.counter.reset()
+        login_account(info)
+        roundtrips.assert_budget(roundtrips.LOGIN_BUDGETS)
+
+    Raises:
+        BudgetExceeded: 任一步骤超出预算
+    """
+    counter.assert_budget(budgets)
+
+
+def enable():
+    """启用统计：之后由 browser._create_driver 等创建的浏览器会被包装"""
+    global _enabled
+    _enabled = True
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def instrument(driver, target: Optional[RoundTripCounter] = None):
+    """
+    包装 driver 实例的 execute()，将每个命令计入当前计时步骤
+
+    只替换该实例的属性，不影响其他 driver；重复调用不会重复计数。
+
+    Args:
+        driver: Selenium WebDriver 实例
+        target: 统计器，默认使用进程级的 counter
+
+    Returns:
+        传入的 driver
+    """
+    if getattr(driver, '_roundtrip_counter', None) is not None:
+        return driver
+
+    target = target if target is not None else counter
+    execute = driver.execute
+
+    def _counted_execute(driver_command, params=None):
+        started = time.perf_counter()
+        try:
+            return execute(driver_command, params)
+        finally:
+            target.record(current_path(), driver_command, time.perf_counter() - started)
+
+    driver.execute = _counted_execute
+    driver._roundtrip_counter = target
+    return driver
+
+
+def maybe_instrument(driver):
+    """统计已启用时包装 driver，否则原样返回"""
+    return instrument(driver) if _enabled else driver
+
+
+def parse_budgets(text: str) -> Dict[str, int]:
+    """
+    解析命令行形式的预算
+
+    Args:
+        text: "step=N,step=N"，如 "set_login_cookie=4,extract_api_key=20"
+
+    Returns:
+        {步骤名称: 最大命令数}
+
+    Raises:
+        ValueError: 格式错误
+    """
+    budgets = {}
+    for item in filter(None, (part.strip() for part in text.split(','))):
+        step, sep, limit = item.partition('=')
+        if not sep or not step.strip():
+            raise ValueError(f"无效的预算项: {item!r}（应为 step=N）")
+        budgets[step.strip()] = int(limit)
+    return budgets
@@ -0,0 +1,165 @@
+"""
+会话快照模块
+登录验证成功后保存 Cookie、localStorage 和 sessionStorage，之后的运行在新浏览器中
+用两个 CDP 命令恢复（Cookie 与存储项各一个），直接打开 Integrations 页面
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Any, Dict, Optional
+
+from .config import CURSOR_WEBSITE, CURSOR_DASHBOARD, SESSION_SNAPSHOT_DIR
+from .storage import read_private_json, write_private_json
+
+# 快照中保留的 Cookie 字段（Network.setCookies 的 CookieParam 子集）
+_COOKIE_FIELDS = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite', 'expires')
+
+_DUMP_STORAGE_SCRIPT = """
+var dump = function (storage) {
+    var items = {};
+    for (var i = 0; i < storage.length; i++) {
+        var key = storage.key(i);
+        items[key] = storage.getItem(key);
+    }
+    return items;
+};
+return {origin: location.origin, local: dump(localStorage), session: dump(sessionStorage)};
+"""
+
+_RESTORE_STORAGE_SCRIPT = """
+(function (snapshot) {
+    if (location.origin !== snapshot.origin) return;
+    try {
+        for (var key in snapshot.local) localStorage.setItem(key, snapshot.local[key]);
+        for (var key in snapshot.session) sessionStorage.setItem(key, snapshot.session[key]);
+    } catch (e) {}
+})(%s);
+"""
+
+
+def save_snapshot(driver, info: Dict[str, str]) -> bool:
+    """
+    保存当前页面所在账户的会话快照
+
+    只应在确认浏览器停留在 Dashboard（而不是认证页面）时调用。快照与 Refresh Token 绑定，
+    以 0600 权限写入 SESSION_SNAPSHOT_DIR。
+
+    Args:
+        driver: Selenium WebDriver 实例
+        info: 用户信息字典
+
+    Returns:
+        成功返回 True，失败返回 False
+    """
+    try:
+        cookies = driver.execute_cdp_cmd("Network.getCookies", {
+            'urls': [CURSOR_WEBSITE, CURSOR_DASHBOARD]
+        }).get('cookies', [])
+        storage = driver.execute_script(_DUMP_STORAGE_SCRIPT) or {}
+    except Exception as e:
+        print(f"   ⚠️  无法读取会话状态: {e}")
+        return False
+
+    snapshot = {
+        'token_sha256': _token_fingerprint(info),
+        'saved_at': int(time.time()),
+        'cookies': [_compact_cookie(c) for c in cookies],
+        'storage': {
+            'origin': storage.get('origin'),
+            'local': storage.get('local') or {},
+            'session': storage.get('session') or {}
+        }
+    }
+    if not write_private_json(_snapshot_path(info), snapshot):
+        return False
+    print(f"💾 会话快照已保存（{len(snapshot['cookies'])} 个 Cookie）")
+    return True
+
+
+def load_snapshot(info: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    """
+    读取账户的会话快照
+
+    数据库中的 Refresh Token 已变化时快照作废并被删除；已过期的 Cookie 被丢弃。
+
+    Args:
+        info: 用户信息字典
+
+    Returns:
+        快照字典，不存在或已失效时返回 None
+    """
+    snapshot = read_private_json(_snapshot_path(info))
+    if not isinstance(snapshot, dict):
+        return None
+    if snapshot.get('token_sha256') != _token_fingerprint(info):
+        discard_snapshot(info)
+        return None
+
+    now = time.time()
+    snapshot['cookies'] = [c for c in snapshot.get('cookies', [])
+                           if not c.get('expires') or c['expires'] > now]
+    return snapshot if snapshot['cookies'] else None
+
+
+def restore_snapshot(driver, snapshot: Dict[str, Any]) -> Optional[str]:
+    """
+    将快照恢复到新浏览器中（在首次导航之前调用）
+
+    共两个 CDP 命令：Cookie 通过一次 Network.setCookies 写入；存储项通过
+    Page.addScriptToEvaluateOnNewDocument 在下一个页面加载时、页面脚本运行前写入
+    （没有存储项时省略）。HttpOnly Cookie 无法由页面脚本写入，因此不能合并为一个命令。
+
+    Args:
+        driver: Selenium WebDriver 实例
+        snapshot: load_snapshot() 返回的快照
+
+    Returns:
+        注入脚本的标识（首次导航后交给 forget_restore_script 移除），无存储项时返回 None
+    """
+    driver.execute_cdp_cmd("Network.setCookies", {'cookies': snapshot['cookies']})
+
+    storage = snapshot.get('storage') or {}
+    if not storage.get('origin') or not (storage.get('local') or storage.get('session')):
+        return None
+    source = _RESTORE_STORAGE_SCRIPT % json.dumps(storage)
+    return driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument",
+                                  {'source': source})['identifier']
+
+
+def forget_restore_script(driver, identifier: Optional[str]):
+    """移除恢复存储项的注入脚本，避免之后的页面加载覆盖新的存储内容"""
+    if identifier is None:
+        return
+    try:
+        driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument",
+                               {'identifier': identifier})
+    except Exception:
+        pass
+
+
+def discard_snapshot(info: Dict[str, str]):
+    """删除账户的会话快照"""
+    try:
+        os.unlink(_snapshot_path(info))
+    except OSError:
+        pass
+
+
+def _compact_cookie(cookie: Dict[str, Any]) -> Dict[str, Any]:
+    """只保留恢复所需的字段；会话 Cookie 不带 expires"""
+    compact = {k: cookie[k] for k in _COOKIE_FIELDS if k in cookie}
+    if cookie.get('session') or compact.get('expires', 0) <= 0:
+        compact.pop('expires', None)
+    return compact
+
+
+def _token_fingerprint(info: Dict[str, str]) -> str:
+    return hashlib.sha256(f"{info['user_id']}::{info['token']}".encode()).hexdigest()
+
+
+def _snapshot_path(info: Dict[str, str]) -> str:
+    name = re.sub(r'[^A-Za-z0-9_-]', '_', info.get('user_id') or 'unknown')
+    return os.path.join(SESSION_SNAPSHOT_DIR, f"{name}.json")
@@ -0,0 +1,58 @@
+"""
+本地存储模块
+读写仅当前用户可访问（0600）的 JSON 文件，用于各类本地缓存
+"""
+
+import json
+import os
+import stat
+import tempfile
+from typing import Any, Optional
+
+
+def read_private_json(path: str) -> Optional[Any]:
+    """
+    读取私有 JSON 文件
+
+    文件不存在、无法解析，或权限对组/其他用户开放时返回 None。
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        解析后的 JSON 数据，失败返回 None
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if os.fstat(f.fileno()).st_mode & (stat.S_IRWXG | stat.S_IRWXO):
+                return None
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_private_json(path: str, data: Any) -> bool:
+    """
+    原子写入私有 JSON 文件（权限 0600，目录权限 0700）
+
+    Args:
+        path: 文件路径
+        data: 可序列化为 JSON 的数据
+
+    Returns:
+        成功返回 True，失败返回 False
+    """
+    directory = os.path.dirname(path) or '.'
+    tmp_path = None
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.json')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, path)
+        return True
+    except OSError:
+        if tmp_path and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        return False
@@ -0,0 +1,218 @@
+"""
+计时模块
+为登录流程的每个步骤记录耗时区间（span），并导出 JSON / Prometheus 文本
+"""
+
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class Span:
+    """
+    单个步骤的计时区间
+
+    Attributes:
+        name: 步骤名称
+        start: 开始时间（time.monotonic）
+        end: 结束时间（time.monotonic），未结束为 None
+        outcome: "ok"、"fail"（步骤返回失败）或 "error"（抛出异常）
+        retries: 步骤内的重试次数
+        parent: 外层步骤名称
+        attrs: 附加属性（如 URL、账户）
+    """
+
+    def __init__(self, name: str, parent: Optional[str] = None, **attrs):
+        self.name = name
+        self.parent = parent
+        self.attrs = attrs
+        self.thread = threading.current_thread().name
+        self.start = time.monotonic()
+        self.end = None
+        self.outcome = "ok"
+        self.retries = 0
+
+    @property
+    def duration(self) -> float:
+        end = self.end if self.end is not None else time.monotonic()
+        return end - self.start
+
+    def fail(self):
+        """将步骤标记为失败（未抛异常但未达成目标）"""
+        self.outcome = "fail"
+
+    def to_dict(self, origin: float = 0.0) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'parent': self.parent,
+            'thread': self.thread,
+            'start': round(self.start - origin, 6),
+            'end': round((self.end if self.end is not None else time.monotonic()) - origin, 6),
+            'duration': round(self.duration, 6),
+            'outcome': self.outcome,
+            'retries': self.retries,
+            'attrs': self.attrs
+        }
+
+
+class TimingRecorder:
+    """线程安全的 span 收集器"""
+
+    def __init__(self):
+        self.origin = time.monotonic()
+        self._spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> List[Span]:
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        stack = self._stack()
+        current = Span(name, parent=stack[-1].name if stack else None, **attrs)
+        stack.append(current)
+        try:
+            yield current
+        except BaseException:
+            current.outcome = "error"
+            raise
+        finally:
+            current.end = time.monotonic()
+            stack.pop()
+            with self._lock:
+                self._spans.append(current)
+
+    def current(self) -> Optional[Span]:
+        """当前线程最内层的 span"""
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def current_path(self) -> Tuple[str, ...]:
+        """当前线程从外到内的 span 名称"""
+        return tuple(s.name for s in self._stack())
+
+    def spans(self) -> List[Span]:
+        with self._lock:
+            return sorted(self._spans, key=lambda s: s.start)
+
+    def reset(self):
+        with self._lock:
+            self._spans = []
+            self.origin = time.monotonic()
+
+    def to_json(self) -> str:
+        """导出所有 span 为 JSON"""
+        spans = self.spans()
+        return json.dumps({
+            'total': round(max((s.end for s in spans), default=self.origin) - self.origin, 6),
+            'spans': [s.to_dict(self.origin) for s in spans]
+        }, ensure_ascii=False, indent=2)
+
+    def to_prometheus(self) -> str:
+        """按 (步骤, 结果) 聚合导出 Prometheus 文本格式"""
+        totals: Dict[tuple, List[float]] = {}
+        for s in self.spans():
+            entry = totals.setdefault((s.name, s.outcome), [0.0, 0, 0])
+            entry[0] += s.duration
+            entry[1] += 1
+            entry[2] += s.retries
+
+        lines = [
+            "# HELP cursor_login_step_duration_seconds Wall-clock time spent in each login step.",
+            "# TYPE cursor_login_step_duration_seconds summary",
+        ]
+        for (name, outcome), (duration, count, _) in sorted(totals.items()):
+            labels = f'step="{name}",outcome="{outcome}"'
+            lines.append(f"cursor_login_step_duration_seconds_sum{{{labels}}} {duration:.6f}")
+            lines.append(f"cursor_login_step_duration_seconds_count{{{labels}}} {count}")
+
+        lines += [
+            "# HELP cursor_login_step_retries_total Retries performed inside each login step.",
+            "# TYPE cursor_login_step_retries_total counter",
+        ]
+        for (name, outcome), (_, _, retries) in sorted(totals.items()):
+            lines.append(f'cursor_login_step_retries_total{{step="{name}",outcome="{outcome}"}} {retries}')
+
+        return "\n".join(lines) + "\n"
+
+
+# 进程级默认收集器
+recorder = TimingRecorder()
+
+
+def span(name: str, **attrs):
+    """
+    在默认收集器中记录一个步骤
+
+    用法：
+        with span("launch_browser") as s:
+            ...
+            s.retries += 1
+    """
+    return recorder.span(name, **attrs)
+
+
+def timed(name: str, check: Optional[Callable[[Any], bool]] = None):
+    """
+    装饰器：将函数调用记录为一个步骤
+
+    返回值为 None / False（或 check 判定失败）时步骤结果记为 "fail"。
+
+    Args:
+        name: 步骤名称
+        check: 自定义的成功判定函数，参数为被装饰函数的返回值
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name) as s:
+                value = func(*args, **kwargs)
+                ok = check(value) if check is not None else value not in (None, False)
+                if not ok:
+                    s.fail()
+                return value
+        return wrapper
+    return decorator
+
+
+def current_span() -> Optional[Span]:
+    """当前线程最内层的 span"""
+    return recorder.current()
+
+
+def current_path() -> Tuple[str, ...]:
+    """当前线程从外到内的 span 名称"""
+    return recorder.current_path()
+
+
+def note_retry():
+    """为当前步骤的重试次数加一"""
+    current = recorder.current()
+    if current is not None:
+        current.retries += 1
+
+
+def write_timing_report(json_path: Optional[str] = None, prom_path: Optional[str] = None):
+    """
+    输出计时报告
+
+    Args:
+        json_path: JSON 报告路径，"-" 表示输出到标准输出
+        prom_path: Prometheus 文本报告路径，"-" 表示输出到标准输出
+    """
+    for path, content in ((json_path, recorder.to_json), (prom_path, recorder.to_prometheus)):
+        if not path:
+            continue
+        text = content()
+        if path == '-':
+            print(text)
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            print(f"⏱️  计时报告已写入 {path}")
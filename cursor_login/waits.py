@@ -0,0 +1,111 @@
+"""
+页面等待模块
+基于条件的等待工具，替代固定时长的 time.sleep
+"""
+
+from urllib.parse import urlsplit
+
+from .config import DEFAULT_TIMEOUT, POLL_FREQUENCY, AUTHENTICATOR_HOST, CURSOR_DASHBOARD, COOKIE_DOMAIN
+from .timing import span, timed
+
+
+def wait_for(driver, timeout: float):
+    """
+    创建按 POLL_FREQUENCY 轮询的 WebDriverWait（延迟导入 Selenium）
+
+    Args:
+        driver: Selenium WebDriver 实例
+        timeout: 最长等待时间（秒）
+
+    Returns:
+        WebDriverWait 实例
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    return WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY)
+
+
+def navigate(driver, url: str):
+    """
+    导航到指定 URL，并记录为一个计时步骤
+
+    Args:
+        driver: Selenium WebDriver 实例
+        url: 目标 URL
+    """
+    with span("navigate", url=url):
+        driver.get(url)
+
+
+def is_dashboard_url(url: str) -> bool:
+    """
+    URL 是否为 Dashboard 本身（忽略查询参数，如 ?tab=integrations）
+
+    Args:
+        url: 当前页面 URL
+
+    Returns:
+        位于 Cookie 域名下的 Dashboard 路径返回 True；认证页面或其他页面返回 False
+    """
+    if not url or AUTHENTICATOR_HOST in url:
+        return False
+    parts, dashboard = urlsplit(url), urlsplit(CURSOR_DASHBOARD)
+    host = (parts.hostname or '').lower()
+    domain = COOKIE_DOMAIN.lstrip('.').lower()
+    # cursor.com 与 www.cursor.com 之间可能互相跳转，Cookie 域名下的主机都接受
+    same_site = (parts.netloc == dashboard.netloc or host == domain or host.endswith('.' + domain))
+    return same_site and parts.path.rstrip('/') == dashboard.path.rstrip('/')
+
+
+@timed("wait:page_ready")
+def wait_for_page_ready(driver, timeout: float = DEFAULT_TIMEOUT) -> bool:
+    """
+    等待页面 document.readyState 变为 complete
+
+    Args:
+        driver: Selenium WebDriver 实例
+        timeout: 超时时间（秒）
+
+    Returns:
+        页面就绪返回 True，超时返回 False
+    """
+    try:
+        wait_for(driver, timeout).until(
+            lambda d: d.execute_script("return document.readyState") == "complete"
+        )
+        return True
+    except Exception:
+        return False
+
+
+@timed("wait:dashboard")
+def wait_for_dashboard(driver, timeout: float = DEFAULT_TIMEOUT) -> str:
+    """
+    等待 Dashboard 加载完成，或被重定向到认证页面
+
+    页面就绪且出现主体内容时视为 Dashboard 已加载；
+    URL 跳转到认证页面时立即返回，由调用方处理。
+
+    Args:
+        driver: Selenium WebDriver 实例
+        timeout: 超时时间（秒）
+
+    Returns:
+        等待结束时的 URL
+    """
+    def _settled(d):
+        url = d.current_url
+        if AUTHENTICATOR_HOST in url:
+            return True
+        if "dashboard" not in url:
+            return False
+        return d.execute_script(
+            "return document.readyState === 'complete' && "
+            "!!document.querySelector('main, nav, [role=main], button');"
+        )
+
+    try:
+        wait_for(driver, timeout).until(_settled)
+    except Exception:
+        pass
+    return driver.current_url
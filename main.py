@@ -15,15 +15,52 @@ Cursor 全自动登录工具主入口
   python3 main.py           # 无头模式（后台运行）
   python3 main.py --show    # 显示浏览器界面
   python3 main.py --visible # 显示浏览器界面（同 --show）
+  python3 main.py --http    # 优先使用 HTTP 快速通道，失败时回退到浏览器
+  python3 main.py --info    # 仅显示账户信息和 Token 过期时间（不启动浏览器）
+  python3 main.py --pipeline  # Token 预检后，启动浏览器与校验已有 Key 并行执行
+  python3 main.py --profile   # 使用 cProfile 分析登录流程各步骤的耗时
+  python3 main.py --roundtrips  # 统计每个步骤发出的 WebDriver 命令数
+  python3 main.py --batch accounts.csv --parallel 4  # 批量登录多个账户
+  python3 main.py --daemon  # 守护模式：在 Token 过期前自动重新登录并刷新 API Key
+
+退出码：
+  0  成功
+  1  登录失败或发生错误
+  3  Token 预检失败（过期或格式错误），未启动浏览器
+  4  登录成功，但某个步骤的 WebDriver 命令数超出 --roundtrip-budget
 """
 
+import argparse
 import sys
+from typing import Dict, Optional
 
 from cursor_login import (
     get_cursor_token,
-    auto_login_with_selenium,
+    login_account,
     get_manual_login_script
 )
+from cursor_login.config import (
+    BATCH_PARALLELISM,
+    BATCH_RESULTS_PATH,
+    LOGIN_BACKEND,
+    API_KEY_EXTRACTION,
+    BROWSER_PROFILE,
+    API_KEY_REUSE,
+    PERSISTENT_PROFILE,
+    SESSION_SNAPSHOT,
+    PROFILER_OUTPUT_PREFIX,
+    DAEMON_REFRESH_MARGIN,
+    DAEMON_JITTER,
+    DAEMON_CONCURRENCY
+)
+from cursor_login.database import validate_token
+from cursor_login.roundtrips import parse_budgets
+from cursor_login.timing import write_timing_report
+
+EXIT_OK = 0
+EXIT_FAILURE = 1
+EXIT_INVALID_TOKEN = 3
+EXIT_BUDGET_EXCEEDED = 4
 
 
 def parse_arguments():
@@ -31,14 +68,62 @@ def parse_arguments():
     解析命令行参数
 
     Returns:
-        headless: 是否使用无头模式
+        argparse.Namespace，其中 headless 表示是否使用无头模式
     """
-    headless = True  # 默认无头模式
-    if len(sys.argv) > 1:
-        arg = sys.argv[1].lower()
-        if arg in ['--show', '--visible', '-v', '-s']:
-            headless = False
-    return headless
+    parser = argparse.ArgumentParser(description="Cursor 全自动登录工具")
+    parser.add_argument('--show', '--visible', '-s', '-v', dest='headless',
+                        action='store_false', help="显示浏览器界面")
+    parser.add_argument('--info', action='store_true',
+                        help="仅显示账户信息和 Token 过期时间，不启动浏览器")
+    parser.add_argument('--http', dest='backend', action='store_const',
+                        const='http', default=LOGIN_BACKEND,
+                        help="优先使用纯 HTTP 快速通道（无需浏览器），失败时回退到浏览器")
+    parser.add_argument('--capture-network', dest='extraction', action='store_const',
+                        const='network', default=API_KEY_EXTRACTION,
+                        help="从创建请求的网络响应中直接读取 API Key（失败时回退到页面提取）")
+    parser.add_argument('--lean', dest='profile', action='store_const',
+                        const='lean', default=BROWSER_PROFILE,
+                        help="精简浏览器配置：屏蔽图片、字体和统计脚本，关闭扩展与后台网络（仅后台模式）")
+    parser.add_argument('--new-key', dest='reuse_key', action='store_false', default=API_KEY_REUSE,
+                        help="总是创建新的 API Key，不复用仍然有效的已有 Key")
+    parser.add_argument('--persistent-profile', action='store_true', default=PERSISTENT_PROFILE,
+                        help="为每个账户保留独立的 Chrome 用户数据目录，会话仍然有效时跳过 Cookie 设置和验证")
+    parser.add_argument('--no-snapshot', dest='session_snapshot', action='store_false',
+                        default=SESSION_SNAPSHOT,
+                        help="不恢复也不保存会话快照（Cookie 与本地存储），每次都重新设置 Cookie 并验证登录")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="流水线模式：Token 预检通过后启动浏览器与校验已有 API Key 并行，"
+                             "写入环境变量与关闭浏览器并行")
+    parser.add_argument('--profile', dest='profile_output', nargs='?', metavar='PREFIX',
+                        const=PROFILER_OUTPUT_PREFIX,
+                        help="使用 cProfile 分析本次运行，写出 PREFIX.pstats 和折叠栈 PREFIX.folded，"
+                             f"并打印各步骤耗时（默认前缀 {PROFILER_OUTPUT_PREFIX}）")
+    parser.add_argument('--roundtrips', action='store_true',
+                        help="统计每个步骤向 chromedriver 发出的命令数与耗时，结束时打印汇总")
+    parser.add_argument('--roundtrip-budget', type=parse_budgets, metavar='STEP=N[,STEP=N...]',
+                        help="各步骤 WebDriver 命令数上限（隐含 --roundtrips），超出时以退出码 4 结束，"
+                             "如 set_login_cookie=4,extract_api_key=20")
+    parser.add_argument('--timing-json', metavar='FILE',
+                        help="运行结束后将各步骤耗时以 JSON 写入 FILE（- 表示标准输出）")
+    parser.add_argument('--timing-prom', metavar='FILE',
+                        help="运行结束后将各步骤耗时以 Prometheus 文本格式写入 FILE（- 表示标准输出）")
+    parser.add_argument('--batch', metavar='FILE',
+                        help="批量模式：从 CSV 账户文件（email,token,db_path）读取多个账户")
+    parser.add_argument('--parallel', type=int, default=BATCH_PARALLELISM, metavar='N',
+                        help=f"批量模式的最大并发数（默认 {BATCH_PARALLELISM}）")
+    parser.add_argument('--contexts', action='store_true',
+                        help="批量模式：只启动一个无头 Chrome，每个账户使用独立的浏览器上下文")
+    parser.add_argument('--output', default=BATCH_RESULTS_PATH, metavar='FILE',
+                        help=f"批量模式的结果文件（默认 {BATCH_RESULTS_PATH}）")
+    parser.add_argument('--daemon', action='store_true',
+                        help="守护模式：在 Token 过期前自动重新登录（配合 --batch 时刷新文件中的所有账户）")
+    parser.add_argument('--margin', type=float, default=DAEMON_REFRESH_MARGIN, metavar='SECONDS',
+                        help=f"守护模式下在过期前多少秒刷新（默认 {DAEMON_REFRESH_MARGIN}）")
+    parser.add_argument('--jitter', type=float, default=DAEMON_JITTER, metavar='SECONDS',
+                        help=f"守护模式下随机提前的最大秒数（默认 {DAEMON_JITTER}）")
+    parser.add_argument('--max-concurrent', type=int, default=DAEMON_CONCURRENCY, metavar='N',
+                        help=f"守护模式下同时进行的登录数上限（默认 {DAEMON_CONCURRENCY}）")
+    return parser.parse_args()
 
 
 def print_header(headless: bool):
@@ -92,45 +177,172 @@ def print_manual_login_instructions(info: dict):
     print("-"*60)
 
 
-def main():
-    """主函数"""
-    try:
-        # 解析命令行参数
-        headless = parse_arguments()
+def run(args: argparse.Namespace) -> int:
+    """
+    按命令行参数执行登录
 
-        # 打印标题
-        print_header(headless)
+    Args:
+        args: parse_arguments() 的结果
+
+    Returns:
+        进程退出码
+    """
+    headless = args.headless
 
-        # 获取 Token
-        print("\n📥 正在获取 Cursor Token...")
-        info = get_cursor_token()
+    # 守护模式
+    if args.daemon:
+        from cursor_login.daemon import run_daemon
+        run_daemon(args.batch, margin=args.margin, jitter=args.jitter,
+                   concurrency=args.max_concurrent, headless=headless,
+                   backend=args.backend, extraction=args.extraction,
+                   profile=args.profile,
+                   persistent_profile=args.persistent_profile,
+                   session_snapshot=args.session_snapshot,
+                   reuse_key=args.reuse_key)
+        return EXIT_OK
 
-        if not info:
+    # 批量模式
+    if args.batch:
+        from cursor_login.batch import run_batch
+        summary = run_batch(args.batch, parallelism=args.parallel,
+                            headless=headless, output_path=args.output,
+                            backend=args.backend, extraction=args.extraction,
+                            profile=args.profile, reuse_key=args.reuse_key,
+                            persistent_profile=args.persistent_profile,
+                            contexts=args.contexts,
+                            session_snapshot=args.session_snapshot)
+        return EXIT_OK if summary['failed'] == 0 else EXIT_FAILURE
+
+    # 流水线模式（HTTP 快速通道和 --info 不需要浏览器，仍按顺序执行）
+    # 持久化配置按账户区分，流水线不处理，仍按顺序执行
+    if (args.pipeline and not args.info and args.backend != "http"
+            and not args.persistent_profile):
+        from cursor_login.pipeline import run_pipeline
+        result = run_pipeline(headless=headless, extraction=args.extraction,
+                              profile=args.profile, on_token=print_account_info,
+                              reuse_key=args.reuse_key,
+                              session_snapshot=args.session_snapshot)
+        if result['success']:
+            print("\n✅ 自动登录完成！")
+            return EXIT_OK
+        if result['invalid_token']:
+            return EXIT_INVALID_TOKEN
+        if result['info']:
+            print_manual_login_instructions(result['info'])
+        else:
             print("\n❌ 无法获取账户信息")
-            print("💡 请确保：")
-            print("   1. Cursor 客户端已安装")
-            print("   2. 已经登录过 Cursor 客户端")
-            print("   3. 数据库文件存在")
-            return
+        return EXIT_FAILURE
 
-        # 显示账户信息
-        print_account_info(info)
+    # 获取 Token
+    print("\n📥 正在获取 Cursor Token...")
+    info = get_cursor_token()
 
-        # 开始自动登录
-        success = auto_login_with_selenium(info, headless=headless)
+    if not info:
+        print("\n❌ 无法获取账户信息")
+        print("💡 请确保：")
+        print("   1. Cursor 客户端已安装")
+        print("   2. 已经登录过 Cursor 客户端")
+        print("   3. 数据库文件存在")
+        return EXIT_FAILURE
 
-        if success:
-            print("\n✅ 自动登录完成！")
+    # 显示账户信息
+    print_account_info(info)
+
+    # Token 预检：过期或格式错误时不启动浏览器
+    problem = validate_token(info['token'])
+    if problem:
+        print(f"\n❌ Token 预检失败: {problem}")
+        print("💡 请在 Cursor 客户端中重新登录后再运行")
+        return EXIT_INVALID_TOKEN
+
+    if args.info:
+        return EXIT_OK
+
+    # 开始自动登录
+    success = login_account(info, headless=headless, backend=args.backend,
+                            extraction=args.extraction,
+                            profile=args.profile,
+                            reuse_key=args.reuse_key,
+                            persistent_profile=args.persistent_profile,
+                            session_snapshot=args.session_snapshot,
+                            token_checked=True)['success']
+
+    if success:
+        print("\n✅ 自动登录完成！")
+        return EXIT_OK
+    print_manual_login_instructions(info)
+    return EXIT_FAILURE
+
+
+def report_roundtrips(budgets: Optional[Dict[str, int]], code: int) -> int:
+    """
+    打印 WebDriver 命令统计，并检查命令数预算
+
+    Args:
+        budgets: {步骤名称: 最大命令数}，为空时只打印汇总
+        code: 登录流程的退出码
+
+    Returns:
+        最终退出码：登录已失败时保持原值，否则超出预算时为 EXIT_BUDGET_EXCEEDED
+    """
+    from cursor_login import roundtrips
+
+    print(roundtrips.counter.summary())
+    if not budgets:
+        return code
+    try:
+        roundtrips.assert_budget(budgets)
+    except roundtrips.BudgetExceeded as e:
+        print(f"\n❌ {e}")
+        return code if code != EXIT_OK else EXIT_BUDGET_EXCEEDED
+    print("✅ 各步骤的 WebDriver 命令数均在预算内")
+    return code
+
+
+def main() -> int:
+    """
+    主函数
+
+    Returns:
+        进程退出码
+    """
+    args = None
+    try:
+        # 解析命令行参数
+        args = parse_arguments()
+
+        # 打印标题
+        print_header(args.headless)
+
+        count_roundtrips = args.roundtrips or args.roundtrip_budget is not None
+        if count_roundtrips:
+            from cursor_login import roundtrips
+            roundtrips.enable()
+
+        # 性能分析（按需导入，未使用时不加载 cProfile）
+        if args.profile_output:
+            from cursor_login.profiler import profiled
+            with profiled(args.profile_output):
+                code = run(args)
         else:
-            print_manual_login_instructions(info)
+            code = run(args)
+
+        if count_roundtrips:
+            code = report_roundtrips(args.roundtrip_budget, code)
+        return code
 
     except KeyboardInterrupt:
         print("\n\n👋 已取消")
+        return EXIT_FAILURE
     except Exception as e:
         print(f"\n❌ 错误: {e}")
         import traceback
         traceback.print_exc()
+        return EXIT_FAILURE
+    finally:
+        if args is not None:
+            write_timing_report(args.timing_json, args.timing_prom)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
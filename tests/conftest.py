@@ -0,0 +1,47 @@
+"""
+测试公共设置
+
+在导入 cursor_login 之前启动本地模拟 cursor.com，并将 CURSOR_LOGIN_* 配置指向它和临时目录
+（配置在导入时读取环境变量）。
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARKS = os.path.join(ROOT, "benchmarks")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCHMARKS)
+
+from make_vscdb import make_vscdb  # noqa: E402
+from mock_server import MockCursorServer  # noqa: E402
+
+WORKDIR = tempfile.mkdtemp(prefix="cursor_login_tests_")
+ACCOUNT = make_vscdb(os.path.join(WORKDIR, "state.vscdb"), filler_rows=0)
+SERVER = MockCursorServer(f"{ACCOUNT['user_id']}::{ACCOUNT['token']}",
+                          email=ACCOUNT['email'], render_delay=0).start()
+
+os.environ.update(SERVER.env())
+os.environ.update({
+    'CURSOR_LOGIN_DB_PATH': os.path.join(WORKDIR, "state.vscdb"),
+    'CURSOR_LOGIN_CACHE_DIR': os.path.join(WORKDIR, "cache"),
+    'CURSOR_LOGIN_ZSHRC_PATH': os.path.join(WORKDIR, "zshrc"),
+})
+
+
+@pytest.fixture
+def server():
+    """模拟 cursor.com；每个测试开始时清空请求记录并恢复默认行为"""
+    SERVER.requests.clear()
+    SERVER.dashboard_redirect = None
+    yield SERVER
+    SERVER.dashboard_redirect = None
+
+
+@pytest.fixture
+def account():
+    """模拟服务器认可的账户：{'email', 'token', 'user_id'}"""
+    return dict(ACCOUNT)
@@ -0,0 +1,214 @@
+"""
+模拟 chromedriver 的 WebDriver
+
+FakeChrome 是真正的 Selenium Remote WebDriver，只是命令不经 HTTP 发往 chromedriver，
+而是由 FakeChromeExecutor 在进程内应答：页面导航通过 HTTP 请求模拟 cursor.com，
+Cookie 与 CDP 命令在内存中处理，登录流程用到的页面脚本按脚本内容给出结果。
+每个 Selenium 调用发出的命令与连接真实 chromedriver 时相同，可用于统计往返次数。
+"""
+
+import http.client
+import json
+from typing import Any, Dict, List, Optional
+from urllib.parse import urljoin, urlsplit
+
+from selenium import webdriver
+
+from cursor_login.api_key import _COLLECT_KEYS_SCRIPT, _WAIT_FOR_NEW_KEY_SCRIPT
+from cursor_login.locators import _FIND_BUTTON_SCRIPT
+from cursor_login.snapshot import _DUMP_STORAGE_SCRIPT
+
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+NAME_INPUT_XPATH = "//input[@placeholder='Enter User API Key Name...']"
+
+
+class FakeChrome(webdriver.Remote):
+    """与 driver_service.remote_chrome 创建的会话一样，CDP 命令经 execute() 发出"""
+
+    def __init__(self, server):
+        super().__init__(command_executor=FakeChromeExecutor(server), options=webdriver.ChromeOptions())
+
+    def execute_cdp_cmd(self, cmd: str, cmd_args: dict):
+        return self.execute("executeCdpCommand", {'cmd': cmd, 'params': cmd_args})['value']
+
+
+class FakeChromeExecutor:
+    """
+    进程内应答 WebDriver 命令
+
+    Args:
+        server: benchmarks/mock_server.py 的 MockCursorServer
+    """
+
+    def __init__(self, server):
+        self.server = server
+        self.url = "about:blank"
+        self.page = ""
+        self.cookies: Dict[str, Dict[str, Any]] = {}
+        self.modal_open = False
+        self.key_name = ""
+        self.created_key: Optional[str] = None
+
+    def execute(self, command: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        handler = getattr(self, f"_cmd_{command}", None)
+        if handler is None:
+            return _error("unknown command", command)
+        return handler(params)
+
+    def close(self):
+        pass
+
+    # --- 会话与导航 -------------------------------------------------------------
+
+    def _cmd_newSession(self, params):
+        return _value({'sessionId': 'fake', 'capabilities': {'browserName': 'chrome'}})
+
+    def _cmd_quit(self, params):
+        return _value(None)
+
+    def _cmd_get(self, params):
+        self._navigate(params['url'])
+        return _value(None)
+
+    def _cmd_getCurrentUrl(self, params):
+        return _value(self.url)
+
+    def _cmd_getPageSource(self, params):
+        return _value(self.page + (self.created_key or ""))
+
+    def _navigate(self, url: str):
+        self.modal_open = False
+        self.created_key = None
+        if not url.startswith("http"):
+            self.url, self.page = url, ""
+            return
+        for _ in range(5):
+            status, headers, body = self._request('GET', url)
+            if status in (301, 302, 303, 307, 308):
+                url = urljoin(url, headers['location'])
+                continue
+            break
+        self.url, self.page = url, body
+
+    def _request(self, method: str, url: str, body: Optional[bytes] = None):
+        parts = urlsplit(url)
+        conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=5)
+        headers = {'Content-Type': 'application/json'}
+        if self.cookies:
+            headers['Cookie'] = "; ".join(f"{c['name']}={c['value']}" for c in self.cookies.values())
+        try:
+            conn.request(method, parts.path + (f"?{parts.query}" if parts.query else ""),
+                         body=body, headers=headers)
+            response = conn.getresponse()
+            return (response.status, {k.lower(): v for k, v in response.getheaders()},
+                    response.read().decode('utf-8'))
+        finally:
+            conn.close()
+
+    # --- Cookie 与 CDP ----------------------------------------------------------
+
+    def _cmd_getCookies(self, params):
+        return _value(list(self.cookies.values()))
+
+    def _cmd_deleteAllCookies(self, params):
+        self.cookies.clear()
+        return _value(None)
+
+    def _cmd_addCookie(self, params):
+        cookie = params['cookie']
+        self.cookies[cookie['name']] = dict(cookie)
+        return _value(None)
+
+    def _cmd_executeCdpCommand(self, params):
+        cmd, args = params['cmd'], params.get('params') or {}
+        if cmd == "Network.clearBrowserCookies":
+            self.cookies.clear()
+        elif cmd == "Network.setCookie":
+            self.cookies[args['name']] = dict(args)
+            return _value({'success': True})
+        elif cmd == "Network.setCookies":
+            for cookie in args['cookies']:
+                self.cookies[cookie['name']] = dict(cookie)
+        elif cmd == "Network.getCookies":
+            return _value({'cookies': list(self.cookies.values())})
+        elif cmd == "Page.addScriptToEvaluateOnNewDocument":
+            return _value({'identifier': '1'})
+        elif cmd not in ("Page.removeScriptToEvaluateOnNewDocument", "Network.enable",
+                         "Network.setBlockedURLs", "Storage.clearDataForOrigin"):
+            return _error("unknown error", f"unsupported CDP command {cmd}")
+        return _value({})
+
+    # --- 页面脚本与元素 ---------------------------------------------------------
+
+    def _cmd_w3cExecuteScript(self, params):
+        script, args = params['script'], params.get('args') or []
+        if script == _FIND_BUTTON_SCRIPT:
+            return _value(self._find_button(args[0]))
+        if script == _COLLECT_KEYS_SCRIPT:
+            return _value([])
+        if script == _DUMP_STORAGE_SCRIPT:
+            origin = "{0.scheme}://{0.netloc}".format(urlsplit(self.url))
+            return _value({'origin': origin, 'local': {}, 'session': {}})
+        if "document.readyState" in script and "querySelector" in script:
+            return _value(bool(self.page))
+        if "document.readyState" in script:
+            return _value("complete")
+        if script.strip() == "return 1":
+            return _value(1)
+        return _value(None)
+
+    def _cmd_w3cExecuteScriptAsync(self, params):
+        if params['script'] == _WAIT_FOR_NEW_KEY_SCRIPT:
+            return _value(self.created_key)
+        return _value(None)
+
+    def _cmd_findElement(self, params):
+        if params.get('value') == NAME_INPUT_XPATH and self.modal_open:
+            return _value(_element('name-input'))
+        return _error("no such element", f"no element matches {params.get('value')}")
+
+    def _cmd_clickElement(self, params):
+        element = params['id']
+        if element == 'new-key':
+            self.modal_open = True
+        elif element == 'save':
+            self._save()
+        return _value(None)
+
+    def _cmd_sendKeysToElement(self, params):
+        text = params.get('text', '')
+        if text[-1:] in ('\ue006', '\ue007'):  # Keys.RETURN / Keys.ENTER
+            self.key_name += text[:-1]
+            self._save()
+        else:
+            self.key_name += text
+        return _value(None)
+
+    def _find_button(self, labels: List[str]):
+        if "Integrations" not in self.page:
+            return None
+        buttons = {'Save': 'save'} if self.modal_open else {'New User API Key': 'new-key'}
+        for label in labels:
+            for text, element in buttons.items():
+                if label in text:
+                    return [_element(element), label]
+        return None
+
+    def _save(self):
+        create_url = urljoin(self.url, "/api/dashboard/create-user-api-key")
+        status, _headers, body = self._request('POST', create_url,
+                                               json.dumps({'name': self.key_name}).encode())
+        if status == 200:
+            self.created_key = json.loads(body)['apiKey']
+
+
+def _value(value):
+    return {'value': value}
+
+
+def _element(element_id: str):
+    return {ELEMENT_KEY: element_id}
+
+
+def _error(error: str, message: str):
+    return {'status': 500, 'value': {'error': error, 'message': message}}
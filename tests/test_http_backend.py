@@ -0,0 +1,53 @@
+"""HTTP 快速通道的会话验证：有效、过期和跳转到其他站点三种情况"""
+
+import pytest
+
+from make_vscdb import make_jwt
+from mock_server import MockCursorServer
+
+from cursor_login.config import COOKIE_NAME
+from cursor_login.database import build_account_info
+from cursor_login.http_backend import login_via_http, verify_login_http
+
+
+@pytest.fixture
+def foreign_server():
+    """另一个站点（127.0.0.1 与模拟 cursor.com 的 localhost 不同源）"""
+    foreign = MockCursorServer("unused").start()
+    yield foreign
+    foreign.stop()
+
+
+def test_valid_session(server, account):
+    info = build_account_info(account['email'], account['token'])
+
+    assert verify_login_http(info) is True
+    assert server.requests[-1][1] == '/dashboard'
+
+
+def test_expired_session_redirects_to_authenticator(server, account):
+    info = build_account_info(account['email'], make_jwt(account['user_id'], ttl=-3600))
+
+    assert verify_login_http(info) is False
+    assert login_via_http(info) is None
+    assert not server.created_keys
+
+
+def test_foreign_redirect_is_not_followed_with_cookie(server, account, foreign_server):
+    server.dashboard_redirect = f"http://127.0.0.1:{foreign_server.port}/dashboard"
+    info = build_account_info(account['email'], account['token'])
+
+    with pytest.raises(RuntimeError):
+        verify_login_http(info)
+    assert login_via_http(info) is None
+
+    leaked = [cookie for _method, _path, cookie in foreign_server.requests
+              if cookie and COOKIE_NAME in cookie]
+    assert not leaked
+
+
+def test_same_origin_redirect_away_from_dashboard_is_not_a_login(server, account):
+    server.dashboard_redirect = "/"
+    info = build_account_info(account['email'], account['token'])
+
+    assert verify_login_http(info) is False
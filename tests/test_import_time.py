@@ -0,0 +1,19 @@
+"""
+只读取 Token 的路径不导入 Selenium（python -X importtime）
+"""
+
+import pytest
+
+from import_time import measure_import
+
+# 未安装 Selenium 时导入跟踪中本来就不会出现它，检查没有意义
+pytest.importorskip("selenium")
+
+
+@pytest.mark.parametrize("statement", [
+    "import cursor_login",
+    "from cursor_login import get_cursor_token",
+])
+def test_token_path_does_not_import_selenium(statement):
+    _import_ms, selenium = measure_import(statement)
+    assert not selenium, f"{statement!r} 的导入跟踪中出现了 selenium"
@@ -0,0 +1,54 @@
+"""登录流程各步骤的 WebDriver 命令数不超过 roundtrips.LOGIN_BUDGETS"""
+
+import pytest
+
+pytest.importorskip("selenium")
+
+from fake_chrome import FakeChrome  # noqa: E402
+
+from cursor_login.browser import login_account  # noqa: E402
+from cursor_login.database import build_account_info  # noqa: E402
+from cursor_login.roundtrips import (  # noqa: E402
+    LOGIN_BUDGETS,
+    BudgetExceeded,
+    RoundTripCounter,
+    instrument
+)
+
+
+class FakePool:
+    """只借出一个统计了命令数的 FakeChrome"""
+
+    def __init__(self, server, counter):
+        self.driver = instrument(FakeChrome(server), counter)
+
+    def acquire(self):
+        return self.driver
+
+    def release(self, driver, discard=False):
+        pass
+
+
+@pytest.fixture
+def counted_login(server, account):
+    counter = RoundTripCounter()
+    info = build_account_info(account['email'], account['token'])
+    result = login_account(info, pool=FakePool(server, counter), update_env=False,
+                           reuse_key=False, session_snapshot=False, extraction="dom")
+    return result, counter
+
+
+def test_login_stays_within_roundtrip_budgets(server, counted_login):
+    result, counter = counted_login
+
+    assert result['success']
+    assert result['api_key'] in [key for _name, key in server.created_keys]
+    counter.assert_budget(LOGIN_BUDGETS)
+
+
+def test_extra_round_trip_exceeds_budget(counted_login):
+    _result, counter = counted_login
+    used = counter.count('set_login_cookie')
+
+    with pytest.raises(BudgetExceeded):
+        counter.assert_budget({'set_login_cookie': used - 1})
@@ -0,0 +1,15 @@
+"""Dashboard 页面判断：决定是否保存会话快照"""
+
+from cursor_login.waits import is_dashboard_url
+
+
+def test_dashboard_and_its_tabs(server):
+    assert is_dashboard_url(f"{server.base_url}/dashboard")
+    assert is_dashboard_url(f"{server.base_url}/dashboard/?tab=integrations")
+
+
+def test_authenticator_and_other_pages_are_not_the_dashboard(server):
+    assert not is_dashboard_url(f"{server.base_url}/authenticator/login?redirect=/dashboard")
+    assert not is_dashboard_url(f"{server.base_url}/")
+    assert not is_dashboard_url(f"http://127.0.0.1:{server.port}/dashboard")
+    assert not is_dashboard_url("")